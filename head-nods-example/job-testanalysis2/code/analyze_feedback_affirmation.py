@@ -1,22 +1,26 @@
-import pandas as pd
+import argparse
 import numpy as np
 from scipy import stats
 import matplotlib.pyplot as plt
 from pathlib import Path
+import permutation
+import preview
+import report
+from data_loader import load_exports
+from report import FeedbackAffirmationResults
+from results_store import ResultsStore
 
 # Set up paths - works from code/ subdirectory
 current_dir = Path(__file__).parent
 data_dir = current_dir.parent / 'data'
 results_dir = current_dir.parent / 'results'
 
-# Create results directory if it doesn't exist
-results_dir.mkdir(exist_ok=True)
-
-# Load the data
-df = pd.read_csv(data_dir / 'function_wide_all_languages.csv')
+# Measurements to analyze
+measurements = ['length (seconds)', 'extremes amplitude', 'velocity']
+labels = ['feedback', 'affirmation']
 
-# Filter to only feedback and affirmation
-df_filtered = df[df['Label'].isin(['feedback', 'affirmation'])].copy()
+# Test choices: 'auto' picks t-test or Mann-Whitney from normality and sample size
+TEST_CHOICES = ['auto', 'permutation-mean', 'permutation-median']
 
 # Function to remove outliers using IQR method
 def remove_outliers(data, column):
@@ -27,171 +31,287 @@ def remove_outliers(data, column):
     upper_bound = Q3 + 1.5 * IQR
     return data[(data[column] >= lower_bound) & (data[column] <= upper_bound)]
 
-# Measurements to analyze
-measurements = ['length (seconds)', 'extremes amplitude', 'velocity']
+# Normality, test choice and effect size for one feedback/affirmation pair
+def analyze_cell(feedback_values, affirmation_values, test='auto', max_permutations=10000, seed=0):
+    n_permutations = None
+    if test.startswith('permutation-'):
+        # Permutation test on the mean or median difference - no normality branching needed
+        statistic_name = test.split('-', 1)[1]
+        result = permutation.permutation_test(feedback_values, affirmation_values, statistic=statistic_name,
+                                              max_permutations=max_permutations, seed=seed)
+        statistic, p_value = result.statistic, result.p_value
+        n_permutations = result.n_permutations
+        test_used = f"Permutation test ({statistic_name} difference)"
+    else:
+        statistic, p_value, test_used = _auto_test(feedback_values, affirmation_values)
+
+    # Effect size (Cohen's d)
+    pooled_std = np.sqrt((np.std(feedback_values)**2 + np.std(affirmation_values)**2) / 2)
+    cohens_d = (np.mean(feedback_values) - np.mean(affirmation_values)) / pooled_std if pooled_std > 0 else 0
+
+    # Interpret effect size
+    if abs(cohens_d) < 0.2:
+        effect_interpretation = "negligible"
+    elif abs(cohens_d) < 0.5:
+        effect_interpretation = "small"
+    elif abs(cohens_d) < 0.8:
+        effect_interpretation = "medium"
+    else:
+        effect_interpretation = "large"
+
+    return {
+        'test_used': test_used,
+        'statistic': statistic,
+        'p_value': p_value,
+        'n_permutations': n_permutations,
+        'cohens_d': cohens_d,
+        'effect_interpretation': effect_interpretation,
+        'is_significant': "YES" if p_value < 0.05 else "NO",
+    }
+
+# t-test or Mann-Whitney, chosen from normality and sample size
+def _auto_test(feedback_values, affirmation_values):
+    # Test for normality (Shapiro-Wilk test)
+    _, p_feedback_norm = stats.shapiro(feedback_values) if len(feedback_values) > 3 else (None, 0)
+    _, p_affirmation_norm = stats.shapiro(affirmation_values) if len(affirmation_values) > 3 else (None, 0)
+
+    # Choose appropriate test based on normality and sample size
+    if p_feedback_norm > 0.05 and p_affirmation_norm > 0.05 and len(feedback_values) > 20 and len(affirmation_values) > 20:
+        # Use parametric test (independent t-test)
+        statistic, p_value = stats.ttest_ind(feedback_values, affirmation_values)
+        test_used = "Independent t-test (parametric)"
+    else:
+        # Use non-parametric test (Mann-Whitney U test)
+        statistic, p_value = stats.mannwhitneyu(feedback_values, affirmation_values, alternative='two-sided')
+        test_used = "Mann-Whitney U test (non-parametric)"
+
+    return statistic, p_value, test_used
 
-# Store results
-results = []
-
-print("=" * 100)
-print("STATISTICAL ANALYSIS: Feedback vs Affirmation by Language")
-print("=" * 100)
-
-# Analyze each language
-for language in df_filtered['language'].unique():
-    print(f"\n{'='*100}")
-    print(f"LANGUAGE: {language}")
-    print(f"{'='*100}")
-    
-    lang_data = df_filtered[df_filtered['language'] == language].copy()
-    
-    # Separate feedback and affirmation
-    feedback = lang_data[lang_data['Label'] == 'feedback']
-    affirmation = lang_data[lang_data['Label'] == 'affirmation']
-    
-    print(f"\nOriginal counts - Feedback: {len(feedback)}, Affirmation: {len(affirmation)}")
-    
-    for measurement in measurements:
-        print(f"\n{'-'*100}")
-        print(f"MEASUREMENT: {measurement}")
-        print(f"{'-'*100}")
-        
-        # Remove outliers for each group separately
-        feedback_clean = remove_outliers(feedback, measurement)
-        affirmation_clean = remove_outliers(affirmation, measurement)
-        
-        n_feedback_removed = len(feedback) - len(feedback_clean)
-        n_affirmation_removed = len(affirmation) - len(affirmation_clean)
-        
-        print(f"After outlier removal:")
-        print(f"  Feedback: {len(feedback_clean)} (removed {n_feedback_removed} outliers)")
-        print(f"  Affirmation: {len(affirmation_clean)} (removed {n_affirmation_removed} outliers)")
-        
-        # Get the cleaned data
-        feedback_values = feedback_clean[measurement].values
-        affirmation_values = affirmation_clean[measurement].values
-        
-        # Descriptive statistics
-        print(f"\nDescriptive Statistics:")
-        print(f"  Feedback    - Mean: {np.mean(feedback_values):.4f}, Median: {np.median(feedback_values):.4f}, SD: {np.std(feedback_values):.4f}")
-        print(f"  Affirmation - Mean: {np.mean(affirmation_values):.4f}, Median: {np.median(affirmation_values):.4f}, SD: {np.std(affirmation_values):.4f}")
-        print(f"  Difference  - Mean: {np.mean(feedback_values) - np.mean(affirmation_values):.4f}")
-        
-        # Test for normality (Shapiro-Wilk test)
-        _, p_feedback_norm = stats.shapiro(feedback_values) if len(feedback_values) > 3 else (None, 0)
-        _, p_affirmation_norm = stats.shapiro(affirmation_values) if len(affirmation_values) > 3 else (None, 0)
-        
-        # Choose appropriate test based on normality and sample size
-        if p_feedback_norm > 0.05 and p_affirmation_norm > 0.05 and len(feedback_values) > 20 and len(affirmation_values) > 20:
-            # Use parametric test (independent t-test)
-            statistic, p_value = stats.ttest_ind(feedback_values, affirmation_values)
-            test_used = "Independent t-test (parametric)"
-        else:
-            # Use non-parametric test (Mann-Whitney U test)
-            statistic, p_value = stats.mannwhitneyu(feedback_values, affirmation_values, alternative='two-sided')
-            test_used = "Mann-Whitney U test (non-parametric)"
-        
-        # Effect size (Cohen's d)
-        pooled_std = np.sqrt((np.std(feedback_values)**2 + np.std(affirmation_values)**2) / 2)
-        cohens_d = (np.mean(feedback_values) - np.mean(affirmation_values)) / pooled_std if pooled_std > 0 else 0
-        
-        # Interpret effect size
-        if abs(cohens_d) < 0.2:
-            effect_interpretation = "negligible"
-        elif abs(cohens_d) < 0.5:
-            effect_interpretation = "small"
-        elif abs(cohens_d) < 0.8:
-            effect_interpretation = "medium"
-        else:
-            effect_interpretation = "large"
-        
-        # Determine significance
-        is_significant = "YES" if p_value < 0.05 else "NO"
-        
-        print(f"\nStatistical Test: {test_used}")
-        print(f"  Test statistic: {statistic:.4f}")
-        print(f"  p-value: {p_value:.4f}")
-        print(f"  Significant difference (α=0.05): {is_significant}")
-        print(f"  Effect size (Cohen's d): {cohens_d:.4f} ({effect_interpretation})")
-        
-        # Store results
-        results.append({
-            'Language': language,
-            'Measurement': measurement,
-            'Feedback_N': len(feedback_clean),
-            'Affirmation_N': len(affirmation_clean),
-            'Feedback_Mean': np.mean(feedback_values),
-            'Affirmation_Mean': np.mean(affirmation_values),
-            'Difference': np.mean(feedback_values) - np.mean(affirmation_values),
-            'Test': test_used,
-            'p_value': p_value,
-            'Significant': is_significant,
-            'Cohens_d': cohens_d,
-            'Effect_Size': effect_interpretation
-        })
-
-# Create summary table
-print(f"\n\n{'='*100}")
-print("SUMMARY TABLE")
-print(f"{'='*100}\n")
-
-results_df = pd.DataFrame(results)
-print(results_df.to_string(index=False))
-
-# Save results to CSV
-results_df.to_csv(results_dir / 'feedback_affirmation_analysis_results.csv', index=False)
-print(f"\n\nResults saved to: feedback_affirmation_analysis_results.csv")
-
-# Create a visualization
-fig, axes = plt.subplots(3, 4, figsize=(20, 15))
-fig.suptitle('Feedback vs Affirmation by Language (Outliers Removed)', fontsize=16, fontweight='bold')
-
-languages = df_filtered['language'].unique()
-
-for idx, measurement in enumerate(measurements):
-    for jdx, language in enumerate(languages):
-        ax = axes[idx, jdx]
-        
-        # Get data for this language
-        lang_data = df_filtered[df_filtered['language'] == language].copy()
+# Outlier removal, descriptives and the cell analysis for one measurement of one language
+def analyze_measurement(feedback, affirmation, measurement, test='auto', max_permutations=10000, seed=0):
+    # Remove outliers for each group separately
+    feedback_clean = remove_outliers(feedback, measurement)
+    affirmation_clean = remove_outliers(affirmation, measurement)
+
+    # Get the cleaned data
+    feedback_values = feedback_clean[measurement].values
+    affirmation_values = affirmation_clean[measurement].values
+
+    cell = analyze_cell(feedback_values, affirmation_values, test, max_permutations, seed)
+
+    row = {
+        'Measurement': measurement,
+        'Feedback_N': len(feedback_clean),
+        'Affirmation_N': len(affirmation_clean),
+        'Feedback_Mean': np.mean(feedback_values),
+        'Affirmation_Mean': np.mean(affirmation_values),
+        'Difference': np.mean(feedback_values) - np.mean(affirmation_values),
+        'Test': cell['test_used'],
+        'p_value': cell['p_value'],
+        'Significant': cell['is_significant'],
+        'Cohens_d': cell['cohens_d'],
+        'Effect_Size': cell['effect_interpretation'],
+        'Feedback_Original': len(feedback),
+        'Affirmation_Original': len(affirmation),
+        'Feedback_Median': np.median(feedback_values),
+        'Affirmation_Median': np.median(affirmation_values),
+        'Feedback_SD': np.std(feedback_values),
+        'Affirmation_SD': np.std(affirmation_values),
+        'Statistic': cell['statistic'],
+    }
+    if cell['n_permutations'] is not None:
+        row['Permutations'] = cell['n_permutations']
+    return row, feedback_values, affirmation_values
+
+def run_analysis(df_filtered, sample=None, test='auto', max_permutations=10000, seed=0):
+    # sample is a preview.StratifiedSample when df_filtered is a preview subsample
+    rows = []
+
+    # Analyze each language
+    for language in df_filtered['language'].unique():
+        lang_data = df_filtered[df_filtered['language'] == language]
+
+        # Separate feedback and affirmation
         feedback = lang_data[lang_data['Label'] == 'feedback']
         affirmation = lang_data[lang_data['Label'] == 'affirmation']
-        
-        # Remove outliers
-        feedback_clean = remove_outliers(feedback, measurement)
-        affirmation_clean = remove_outliers(affirmation, measurement)
-        
-        # Create box plot
-        data_to_plot = [feedback_clean[measurement], affirmation_clean[measurement]]
-        bp = ax.boxplot(data_to_plot, labels=['Feedback', 'Affirmation'], patch_artist=True)
-        
-        # Color the boxes
-        bp['boxes'][0].set_facecolor('lightblue')
-        bp['boxes'][1].set_facecolor('lightgreen')
-        
-        # Add title and labels
-        ax.set_title(f'{language}', fontweight='bold')
-        if jdx == 0:
-            ax.set_ylabel(measurement, fontweight='bold')
-        
-        # Add p-value annotation
-        result = results_df[(results_df['Language'] == language) & (results_df['Measurement'] == measurement)]
-        if not result.empty:
-            p_val = result['p_value'].values[0]
-            sig = result['Significant'].values[0]
-            if sig == 'YES':
-                ax.text(0.5, 0.95, f'p={p_val:.4f}*', transform=ax.transAxes, 
-                       ha='center', va='top', bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.5))
-            else:
-                ax.text(0.5, 0.95, f'p={p_val:.4f}', transform=ax.transAxes, 
-                       ha='center', va='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.5))
-        
-        ax.grid(True, alpha=0.3)
-
-plt.tight_layout()
-plt.savefig(results_dir / 'feedback_affirmation_comparison.png', dpi=300, bbox_inches='tight')
-print(f"Visualization saved to: feedback_affirmation_comparison.png")
-
-print("\n" + "="*100)
-print("ANALYSIS COMPLETE")
-print("="*100)
+
+        for measurement in measurements:
+            row, feedback_values, affirmation_values = analyze_measurement(feedback, affirmation, measurement,
+                                                                           test, max_permutations, seed)
+            row = {'Language': language, **row}
+
+            if sample is not None:
+                # 95% error bounds of the preview estimates
+                # Without a complete scan the stratum sizes are unknown: no finite population correction
+                correction_feedback = sample.correction_population(language, 'feedback')
+                correction_affirmation = sample.correction_population(language, 'affirmation')
+                p_low, p_high = preview.bootstrap_pvalue_bounds(feedback_values, affirmation_values, row['Test'])
+                row.update({
+                    'Feedback_Population': sample.population_size(language, 'feedback'),
+                    'Affirmation_Population': sample.population_size(language, 'affirmation'),
+                    'Difference_Bound95': preview.mean_difference_bound(feedback_values, affirmation_values,
+                                                                        correction_feedback, correction_affirmation),
+                    'Cohens_d_Bound95': preview.cohens_d_bound(row['Cohens_d'], len(feedback_values),
+                                                               len(affirmation_values),
+                                                               correction_feedback, correction_affirmation),
+                    'p_value_Low95': p_low,
+                    'p_value_High95': p_high
+                })
+
+            rows.append(row)
+
+    return FeedbackAffirmationResults.from_rows(rows)
+
+def plot_results(df_filtered, results_df):
+    # Create a visualization: one row per measurement, one column per language
+    languages = df_filtered['language'].unique()
+    fig, axes = plt.subplots(len(measurements), len(languages), figsize=(5 * len(languages), 5 * len(measurements)),
+                             squeeze=False)
+    fig.suptitle('Feedback vs Affirmation by Language (Outliers Removed)', fontsize=16, fontweight='bold')
+
+    for idx, measurement in enumerate(measurements):
+        for jdx, language in enumerate(languages):
+            ax = axes[idx, jdx]
+
+            # Get data for this language
+            lang_data = df_filtered[df_filtered['language'] == language].copy()
+            feedback = lang_data[lang_data['Label'] == 'feedback']
+            affirmation = lang_data[lang_data['Label'] == 'affirmation']
+
+            # Remove outliers
+            feedback_clean = remove_outliers(feedback, measurement)
+            affirmation_clean = remove_outliers(affirmation, measurement)
+
+            # Create box plot
+            data_to_plot = [feedback_clean[measurement], affirmation_clean[measurement]]
+            bp = ax.boxplot(data_to_plot, labels=['Feedback', 'Affirmation'], patch_artist=True)
+
+            # Color the boxes
+            bp['boxes'][0].set_facecolor('lightblue')
+            bp['boxes'][1].set_facecolor('lightgreen')
+
+            # Add title and labels
+            ax.set_title(f'{language}', fontweight='bold')
+            if jdx == 0:
+                ax.set_ylabel(measurement, fontweight='bold')
+
+            # Add p-value annotation
+            result = results_df[(results_df['Language'] == language) & (results_df['Measurement'] == measurement)]
+            if not result.empty:
+                p_val = result['p_value'].values[0]
+                sig = result['Significant'].values[0]
+                if sig == 'YES':
+                    ax.text(0.5, 0.95, f'p={p_val:.4f}*', transform=ax.transAxes,
+                           ha='center', va='top', bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.5))
+                else:
+                    ax.text(0.5, 0.95, f'p={p_val:.4f}', transform=ax.transAxes,
+                           ha='center', va='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.5))
+
+            ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(results_dir / 'feedback_affirmation_comparison.png', dpi=300, bbox_inches='tight')
+
+def main():
+    p = argparse.ArgumentParser(description="Feedback vs affirmation analysis by language")
+    p.add_argument("--data", default=str(data_dir / 'function_wide_all_languages.csv'),
+                   help="Input CSV file, directory of per-language CSV exports, or glob pattern")
+    p.add_argument("--preview", action="store_true",
+                   help="Analyze a stratified sample per (language, Label) cell and report error bounds; skips the plot")
+    p.add_argument("--preview-rows", type=int, default=2000, help="Row budget of the preview sample (default: 2000)")
+    p.add_argument("--preview-seconds", type=float, help="Time budget for scanning the CSV in preview mode")
+    p.add_argument("--test", choices=TEST_CHOICES, default='auto',
+                   help="auto: t-test or Mann-Whitney from normality and n (default); "
+                        "permutation-mean/-median: permutation test on the mean/median difference")
+    p.add_argument("--max-permutations", type=int, default=10000,
+                   help="Permutation cap per cell for permutation tests; stops earlier once clear (default: 10000)")
+    p.add_argument("--seed", type=int, default=0, help="Random seed of the preview sample and permutations (default: 0)")
+    p.add_argument("--quiet", action="store_true",
+                   help="Only compute and store results: no console output and no Markdown reports "
+                        "(regenerate them later with report.py)")
+    args = p.parse_args()
+
+    # Create results directory if it doesn't exist
+    results_dir.mkdir(exist_ok=True)
+
+    sample = None
+    if args.preview:
+        # Reservoir sample: the CSV is streamed, never fully loaded
+        sample = preview.reservoir_sample_csv(args.data, row_budget=args.preview_rows, labels=labels,
+                                              numeric_columns=measurements, max_seconds=args.preview_seconds,
+                                              seed=args.seed)
+        df_filtered = sample.data
+        # Languages cut off by the time budget before both labels were reached cannot be compared
+        partial = [language for language in df_filtered['language'].unique()
+                   if any(sample.population_size(language, label) == 0 for label in labels)]
+        df_filtered = df_filtered[~df_filtered['language'].isin(partial)]
+    else:
+        # Load the data
+        df = load_exports(args.data)
+
+        # Filter to only feedback and affirmation
+        df_filtered = df[df['Label'].isin(labels)].copy()
+
+    if not args.quiet:
+        print("=" * 100)
+        print("STATISTICAL ANALYSIS: Feedback vs Affirmation by Language")
+        if sample is not None:
+            print(f"PREVIEW: {len(df_filtered)} sampled rows, {sample.rows_scanned} rows scanned in {sample.seconds:.2f}s")
+            if not sample.complete:
+                print("WARNING: time budget reached before end of file - sample covers only the rows scanned")
+                print(f"  Languages reached: {', '.join(df_filtered['language'].unique()) or 'none'}; "
+                      f"later rows were never read, so their languages are missing")
+                if partial:
+                    print(f"  Dropped (only one label reached): {', '.join(partial)}")
+                if sample.unread_files:
+                    print(f"  Files not read: {', '.join(path.name for path in sample.unread_files)}")
+                print("  Error bounds assume an unknown population size (no finite population correction)")
+        print("=" * 100)
+
+    results = run_analysis(df_filtered, sample, args.test, args.max_permutations, args.seed)
+    results_df = results.to_frame()
+
+    # Per-cell blocks and summary table, rendered in one pass from the results
+    if not args.quiet:
+        print(report.render_console(results))
+
+    # Record the run in the results store and export the CSV from it;
+    # a later full run overwrites a preview in place
+    params = {'preview': args.preview}
+    if args.test != 'auto':
+        params.update({'test': args.test, 'max_permutations': args.max_permutations, 'seed': args.seed})
+    if args.preview:
+        params.update({'preview_rows': args.preview_rows, 'preview_seconds': args.preview_seconds, 'seed': args.seed})
+    with ResultsStore() as store:
+        run_id = store.record_run('feedback_affirmation', results_df, dataset_path=args.data, params=params,
+                                  script=Path(__file__).name)
+        store.export_csv('feedback_affirmation', run_id=run_id)
+        # Markdown reports describe full runs only; compare_tests.py and sample_size_analysis.py
+        # rewrite them with their sections once they have run on the same data
+        report_paths, missing = [], []
+        if sample is None and not args.quiet:
+            context = report.report_context(store, run_id)
+            report_paths = report.write_reports(results, context)
+            missing = [script for script, companion in (('compare_tests.py', context.comparison),
+                                                        ('sample_size_analysis.py', context.sample_size))
+                       if companion is None]
+    if not args.quiet:
+        print(f"\n\nResults saved to: feedback_affirmation_analysis_results.csv (run {run_id})")
+        for path in report_paths:
+            print(f"Report saved to: {path.name}")
+        if missing:
+            print(f"NOTE: no {' or '.join(missing)} results on this data yet - the reports lack their sections "
+                  f"until {' and '.join(missing)} run on the same data (they update the reports)")
+
+    if sample is None:
+        plot_results(df_filtered, results_df)
+        if not args.quiet:
+            print(f"Visualization saved to: feedback_affirmation_comparison.png")
+
+    if not args.quiet:
+        print("\n" + "="*100)
+        print("PREVIEW COMPLETE - rerun without --preview for full results" if sample is not None else "ANALYSIS COMPLETE")
+        print("="*100)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Resumable batch runner for the feedback vs affirmation analysis.
+
+Takes a manifest CSV of input files and tiers, and runs one job per
+(file, tier, language, measurement) cell on a process pool. Every finished
+job is checkpointed in the results store, together with its result row,
+so an interrupted batch resumes where it stopped when rerun with the same
+--batch-id. A job that fails (e.g. a cell with too few rows) is recorded
+as failed instead of aborting the batch, and is retried on resume; so is a
+manifest entry whose file is missing or cannot be read (tracked per
+manifest path and tier in batch_entries). Batch results are stored under
+their own result kind, so they never stand in for the latest single-dataset
+analysis run.
+
+Manifest format (paths relative to the manifest; empty tier = every tier in the file):
+    path,tier
+    ../data/function_wide_all_languages.csv,function
+
+Usage:
+    python batch_runner.py manifest.csv [--batch-id ID] [--workers N] [--checkpoint-every N]
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import datetime
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from analyze_feedback_affirmation import analyze_measurement, labels, measurements, remove_outliers
+from data_loader import load_exports
+from report import FeedbackAffirmationResults
+from results_store import DEFAULT_DB, ResultsStore, dataset_hash, new_run_id
+
+RESULT_KIND = 'batch_feedback_affirmation'
+
+
+def read_manifest(path: Path) -> list[tuple[Path, str | None]]:
+    """Return (file, tier) entries; tier None means every tier found in the file."""
+    entries = []
+    with path.open(newline='', encoding='utf-8') as fh:
+        for row in csv.DictReader(fh):
+            file_path = Path(row['path'])
+            if not file_path.is_absolute():
+                file_path = path.parent / file_path
+            entries.append((file_path, (row.get('tier') or '').strip() or None))
+    return entries
+
+
+def ensure_jobs_table(store: ResultsStore) -> None:
+    with store.conn:
+        store.conn.execute("""
+            CREATE TABLE IF NOT EXISTS batch_jobs (
+                batch_id TEXT NOT NULL,
+                dataset_hash TEXT NOT NULL,
+                dataset_path TEXT,
+                tier TEXT NOT NULL,
+                "Language" TEXT NOT NULL,
+                "Measurement" TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                finished_at TEXT,
+                PRIMARY KEY (batch_id, dataset_hash, tier, "Language", "Measurement")
+            )""")
+        # One row per manifest entry: whether its file could be loaded
+        store.conn.execute("""
+            CREATE TABLE IF NOT EXISTS batch_entries (
+                batch_id TEXT NOT NULL,
+                dataset_path TEXT NOT NULL,
+                tier TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                finished_at TEXT,
+                PRIMARY KEY (batch_id, dataset_path, tier)
+            )""")
+
+
+def record_entry(store: ResultsStore, batch_id: str, data_path: Path, tier: str | None, error: str | None) -> None:
+    """Record whether a manifest entry loaded ('loaded') or not ('failed'), replacing any earlier attempt."""
+    with store.conn:
+        store.conn.execute(
+            "INSERT OR REPLACE INTO batch_entries VALUES (?, ?, ?, ?, ?, ?)",
+            (batch_id, str(data_path), tier or '', 'loaded' if error is None else 'failed', error,
+             datetime.datetime.now(datetime.timezone.utc).isoformat()))
+
+
+def finished_jobs(store: ResultsStore, batch_id: str) -> set[tuple]:
+    rows = store.conn.execute(
+        "SELECT dataset_hash, tier, \"Language\", \"Measurement\" FROM batch_jobs "
+        "WHERE batch_id = ? AND status = 'done'", (batch_id,))
+    return set(rows)
+
+
+def run_job(feedback: pd.DataFrame, affirmation: pd.DataFrame, measurement: str) -> dict:
+    """Outlier removal and the per-cell analysis for one job; runs in a worker process."""
+    n_feedback = len(remove_outliers(feedback, measurement))
+    n_affirmation = len(remove_outliers(affirmation, measurement))
+    if n_feedback < 3 or n_affirmation < 3:
+        raise ValueError(f"too few rows after outlier removal (feedback n={n_feedback}, "
+                         f"affirmation n={n_affirmation})")
+
+    row, _, _ = analyze_measurement(feedback, affirmation, measurement)
+    return row
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Run the feedback vs affirmation analysis over many files and tiers")
+    p.add_argument("manifest", help="CSV with columns path,tier")
+    p.add_argument("--batch-id", help="Batch to resume (default: start a new batch)")
+    p.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    p.add_argument("--checkpoint-every", type=int, default=20,
+                   help="Commit finished jobs to the store every N jobs (default: 20)")
+    p.add_argument("--db", default=str(DEFAULT_DB), help="Path to the results database")
+    args = p.parse_args()
+
+    manifest = Path(args.manifest)
+    if not manifest.is_file():
+        print(f"Error: manifest not found: {manifest}", file=sys.stderr)
+        return 2
+
+    workers = args.workers or os.cpu_count()
+    batch_id = args.batch_id or new_run_id()
+    store = ResultsStore(Path(args.db))
+    ensure_jobs_table(store)
+    done = finished_jobs(store, batch_id)
+
+    print("=" * 100)
+    print(f"BATCH {batch_id}" + (f" (resuming, {len(done)} jobs already done)" if done else ""))
+    print("=" * 100)
+
+    pending = []   # finished jobs not yet committed: (job key, dataset path, result row or None, error)
+    counts = {'done': 0, 'failed': 0, 'skipped': 0}
+
+    def checkpoint():
+        # One transaction for all jobs finished since the last checkpoint
+        with store.conn:
+            for (data_hash, tier, language, measurement), data_path, row, error in pending:
+                if row is not None:
+                    row_df = FeedbackAffirmationResults.from_rows([{'Dataset': data_path.name, 'Tier': tier,
+                                                                    'Language': language, **row}]).to_frame()
+                    store.register_run(RESULT_KIND, row_df, batch_id, params={'manifest': str(manifest)},
+                                       script=Path(__file__).name)
+                    store.append_rows(RESULT_KIND, row_df, batch_id, data_hash, params={'tier': tier})
+                store.conn.execute(
+                    "INSERT OR REPLACE INTO batch_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (batch_id, data_hash, str(data_path), tier, language, measurement,
+                     'done' if row is not None else 'failed', error,
+                     datetime.datetime.now(datetime.timezone.utc).isoformat()))
+        pending.clear()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for data_path, tier in read_manifest(manifest):
+                try:
+                    if not data_path.is_file():
+                        raise FileNotFoundError(f"file not found: {data_path}")
+                    data_hash = dataset_hash(data_path)
+                    df = load_exports(data_path)
+                    df = df[df['Label'].isin(labels)]
+                    tiers = [tier] if tier is not None else list(df['tier'].unique())
+                except Exception as e:
+                    # Record the entry as failed and go on with the rest of the manifest
+                    error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+                    counts['failed'] += 1
+                    print(f"  ❌ {data_path}: {error}")
+                    record_entry(store, batch_id, data_path, tier, error)
+                    continue
+                record_entry(store, batch_id, data_path, tier, None)
+
+                for tier_name in tiers:
+                    tier_data = df[df['tier'] == tier_name]
+                    for language in tier_data['language'].unique():
+                        lang_data = tier_data[tier_data['language'] == language]
+                        feedback = lang_data[lang_data['Label'] == 'feedback']
+                        affirmation = lang_data[lang_data['Label'] == 'affirmation']
+                        for measurement in measurements:
+                            key = (data_hash, tier_name, language, measurement)
+                            if key in done:
+                                counts['skipped'] += 1
+                                continue
+                            future = pool.submit(run_job, feedback[[measurement]], affirmation[[measurement]],
+                                                 measurement)
+                            futures[future] = (key, data_path)
+
+            print(f"\nScheduled {len(futures)} jobs on {workers} workers ({counts['skipped']} already done)")
+
+            for future in as_completed(futures):
+                key, data_path = futures[future]
+                try:
+                    row, error = future.result(), None
+                    counts['done'] += 1
+                except Exception as e:
+                    row, error = None, ''.join(traceback.format_exception_only(type(e), e)).strip()
+                    counts['failed'] += 1
+                    print(f"  ⚠️  {data_path.name} | {key[1]} | {key[2]} | {key[3]}: {error}")
+                pending.append((key, data_path, row, error))
+                if len(pending) >= args.checkpoint_every:
+                    checkpoint()
+    except KeyboardInterrupt:
+        print(f"\nInterrupted - resume with: --batch-id {batch_id}")
+        return 130
+    finally:
+        # Keep whatever finished before an interruption or crash
+        checkpoint()
+        store.close()
+
+    print(f"\nDone: {counts['done']}, failed: {counts['failed']}, skipped (already done): {counts['skipped']}")
+    if counts['failed']:
+        print(f"Failed jobs are listed in the batch_jobs and batch_entries tables; "
+              f"rerun with --batch-id {batch_id} to retry them")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,10 @@
-import pandas as pd
-import numpy as np
+import argparse
 from scipy import stats
 import matplotlib.pyplot as plt
 from pathlib import Path
+import report
+from data_loader import load_exports
+from fast_stats import clean_cells, variance_checks
 
 # Set up paths - works from code/ subdirectory
 current_dir = Path(__file__).parent
@@ -12,92 +14,55 @@ results_dir = current_dir.parent / 'results'
 # Create results directory if it doesn't exist
 results_dir.mkdir(exist_ok=True)
 
+parser = argparse.ArgumentParser(description="Normality and equal-variance checks per language and measurement")
+parser.add_argument("--data", default=str(data_dir / 'function_wide_all_languages.csv'),
+                    help="Input CSV file, directory of per-language CSV exports, or glob pattern")
+parser.add_argument("--quiet", action="store_true",
+                    help="Only compute the checks and save the figure: no console output")
+args = parser.parse_args()
+
 # Load the data
-df = pd.read_csv(data_dir / 'function_wide_all_languages.csv')
+df = load_exports(args.data)
 
 # Filter to only feedback and affirmation
 df_filtered = df[df['Label'].isin(['feedback', 'affirmation'])].copy()
 
-# Function to remove outliers using IQR method
-def remove_outliers(data, column):
-    Q1 = data[column].quantile(0.25)
-    Q3 = data[column].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-    return data[(data[column] >= lower_bound) & (data[column] <= upper_bound)]
-
 # Measurements to analyze
 measurements = ['length (seconds)', 'extremes amplitude', 'velocity']
 
-print("=" * 100)
-print("NORMALITY TESTS: Shapiro-Wilk Test (p > 0.05 indicates normal distribution)")
-print("=" * 100)
+# IQR outlier removal for every (language, measurement, label) group in one pass
+cells = clean_cells(df_filtered, measurements)
 
-# Create figure for histograms and Q-Q plots
-fig, axes = plt.subplots(4, 6, figsize=(24, 16))
+# Levene's test (median-centered, as stats.levene) and variance ratio from the same cleaned cells
+variances = variance_checks(cells).set_index(['Language', 'Measurement'])
+
+# Create figure for histograms: one row per language, a feedback and an affirmation panel per measurement
+n_languages = df_filtered['language'].nunique()
+fig, axes = plt.subplots(n_languages, 2 * len(measurements), figsize=(24, 4 * n_languages), squeeze=False)
 fig.suptitle('Normality Assessment: Histograms and Q-Q Plots', fontsize=16, fontweight='bold')
 
-row = 0
-for language in df_filtered['language'].unique():
-    print(f"\n{'='*100}")
-    print(f"LANGUAGE: {language}")
-    print(f"{'='*100}")
-    
-    lang_data = df_filtered[df_filtered['language'] == language].copy()
-    
-    # Separate feedback and affirmation
-    feedback = lang_data[lang_data['Label'] == 'feedback']
-    affirmation = lang_data[lang_data['Label'] == 'affirmation']
-    
+rows = []
+for row, language in enumerate(df_filtered['language'].unique()):
     for col_idx, measurement in enumerate(measurements):
-        print(f"\n{measurement}:")
-        
-        # Remove outliers for each group separately
-        feedback_clean = remove_outliers(feedback, measurement)
-        affirmation_clean = remove_outliers(affirmation, measurement)
-        
-        # Get the cleaned data
-        feedback_values = feedback_clean[measurement].values
-        affirmation_values = affirmation_clean[measurement].values
-        
-        # Shapiro-Wilk test for normality
-        if len(feedback_values) > 3:
-            stat_f, p_f = stats.shapiro(feedback_values)
-            is_normal_f = "YES" if p_f > 0.05 else "NO"
-            print(f"  Feedback (n={len(feedback_values)}):    p={p_f:.4f} - Normal? {is_normal_f}")
-        else:
-            p_f = 0
-            is_normal_f = "N/A (too few samples)"
-            print(f"  Feedback (n={len(feedback_values)}):    {is_normal_f}")
-        
-        if len(affirmation_values) > 3:
-            stat_a, p_a = stats.shapiro(affirmation_values)
-            is_normal_a = "YES" if p_a > 0.05 else "NO"
-            print(f"  Affirmation (n={len(affirmation_values)}): p={p_a:.4f} - Normal? {is_normal_a}")
-        else:
-            p_a = 0
-            is_normal_a = "N/A (too few samples)"
-            print(f"  Affirmation (n={len(affirmation_values)}): {is_normal_a}")
-        
-        # Levene's test for equal variances
-        stat_lev, p_lev = stats.levene(feedback_values, affirmation_values)
-        equal_var = "YES" if p_lev > 0.05 else "NO"
-        print(f"  Equal variances (Levene): p={p_lev:.4f} - Equal? {equal_var}")
-        
-        # Recommendation
-        both_normal = (p_f > 0.05 and p_a > 0.05) if len(feedback_values) > 3 and len(affirmation_values) > 3 else False
-        large_samples = len(feedback_values) > 30 and len(affirmation_values) > 30
-        
-        if both_normal and large_samples:
-            print(f"  ✅ RECOMMENDATION: t-test is appropriate (both normal, n>30)")
-        elif both_normal:
-            print(f"  ⚠️  RECOMMENDATION: t-test could work (both normal, but small n)")
-        elif large_samples:
-            print(f"  ⚠️  RECOMMENDATION: t-test might work (large n, CLT applies) BUT Mann-Whitney U is safer")
-        else:
-            print(f"  ❌ RECOMMENDATION: Use Mann-Whitney U test (non-normal distribution and/or small n)")
-        
+        # Get the cleaned data (outliers removed for each group separately)
+        feedback_values, affirmation_values = cells.cell_values(language, measurement)
+
+        # Shapiro-Wilk test for normality (p=0 for groups too small to test)
+        _, p_f = stats.shapiro(feedback_values) if len(feedback_values) > 3 else (None, 0)
+        _, p_a = stats.shapiro(affirmation_values) if len(affirmation_values) > 3 else (None, 0)
+
+        # Normality and equal variances (Levene) of the cell
+        rows.append({
+            'Language': language,
+            'Measurement': measurement,
+            'n_feedback': len(feedback_values),
+            'n_affirmation': len(affirmation_values),
+            'shapiro_p_feedback': p_f,
+            'shapiro_p_affirmation': p_a,
+            'levene_p': variances.at[(language, measurement), 'levene_p'],
+            'variance_ratio': variances.at[(language, measurement), 'variance_ratio'],
+        })
+
         # Create histogram for feedback
         ax_hist_f = axes[row, col_idx * 2]
         ax_hist_f.hist(feedback_values, bins=30, edgecolor='black', alpha=0.7)
@@ -115,36 +80,15 @@ for language in df_filtered['language'].unique():
         ax_hist_a.text(0.95, 0.95, f'p={p_a:.4f}\n{"Normal" if p_a > 0.05 else "Non-normal"}', 
                       transform=ax_hist_a.transAxes, ha='right', va='top',
                       bbox=dict(boxstyle='round', facecolor='lightgreen' if p_a > 0.05 else 'lightcoral', alpha=0.7))
-    
-    row += 1
+
+normality = report.NormalityResults.from_rows(rows)
 
 plt.tight_layout()
 plt.savefig(results_dir / 'normality_assessment.png', dpi=300, bbox_inches='tight')
-print(f"\n\n{'='*100}")
-print("Visualization saved to: normality_assessment.png")
-print("="*100)
-
-# Summary statistics
-print("\n\n" + "="*100)
-print("SUMMARY: When to use t-test vs Mann-Whitney U test")
-print("="*100)
-print("""
-T-TEST (Parametric) Requirements:
-1. Data is normally distributed (Shapiro-Wilk p > 0.05)
-2. OR sample size is large (n > 30) so Central Limit Theorem applies
-3. Independent samples
-4. (For standard t-test) Equal variances (or use Welch's t-test if unequal)
-
-MANN-WHITNEY U TEST (Non-parametric) Use when:
-1. Data is NOT normally distributed (Shapiro-Wilk p < 0.05)
-2. Sample size is small (n < 30) AND data is non-normal
-3. Data has outliers (even after removal)
-4. Data is ordinal or has ties
-5. You want a more robust test with fewer assumptions
-
-In this dataset:
-- Most distributions are NON-NORMAL (Shapiro-Wilk p < 0.05)
-- Some groups have small sample sizes (especially affirmation groups)
-- Even after outlier removal, distributions remain skewed
-- Therefore, Mann-Whitney U test is the SAFER and MORE APPROPRIATE choice
-""")
+
+# Per-cell checks and the summary, rendered in one pass from the results
+if not args.quiet:
+    print(report.render_normality_console(normality))
+    print("="*100)
+    print("Visualization saved to: normality_assessment.png")
+    print("="*100)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Load one or many per-language CSV exports into a single table.
+
+The source can be a single CSV file, a directory (all *.csv inside) or a
+glob pattern. Files are parsed concurrently, checked against the expected
+seven-column schema, and combined into one table with Label, language and
+tier as categoricals. Each parsed file is cached as a pickle in
+processed_data/cache/ and reused while the file's size and modification
+time are unchanged, so adding one language export only parses that file.
+
+Usage:
+    python data_loader.py SOURCE [--workers N] [--no-cache]
+"""
+
+from __future__ import annotations
+import argparse
+import glob
+import hashlib
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+current_dir = Path(__file__).parent
+DEFAULT_CACHE_DIR = current_dir.parent / 'processed_data' / 'cache'
+
+EXPECTED_COLUMNS = ['Label', 'ObservationID', 'language', 'tier',
+                    'length (seconds)', 'extremes amplitude', 'velocity']
+CATEGORICAL_COLUMNS = ['Label', 'language', 'tier']
+
+
+def find_exports(source: str | Path) -> list[Path]:
+    """Resolve a file, directory or glob pattern to a sorted list of CSV files."""
+    path = Path(source)
+    if path.is_file():
+        return [path]
+    if path.is_dir():
+        files = sorted(path.glob('*.csv'))
+    else:
+        files = sorted(Path(p) for p in glob.glob(str(source)) if Path(p).is_file())
+    if not files:
+        raise FileNotFoundError(f"no CSV files found for: {source}")
+    return files
+
+
+def check_schema(path: Path, columns) -> None:
+    if list(columns) != EXPECTED_COLUMNS:
+        missing = [c for c in EXPECTED_COLUMNS if c not in columns]
+        extra = [c for c in columns if c not in EXPECTED_COLUMNS]
+        detail = []
+        if missing:
+            detail.append(f"missing {missing}")
+        if extra:
+            detail.append(f"unexpected {extra}")
+        if not detail:
+            detail.append("columns out of order")
+        raise ValueError(f"{path}: schema does not match the expected columns ({'; '.join(detail)})")
+
+
+def _cache_path(path: Path, cache_dir: Path) -> Path:
+    key = hashlib.sha1(str(path.resolve()).encode('utf-8')).hexdigest()[:12]
+    return cache_dir / f"{path.stem}-{key}.pkl"
+
+
+def load_export(path: Path, cache_dir: Path | None = DEFAULT_CACHE_DIR) -> pd.DataFrame:
+    """Parse one CSV export, reusing its cached binary if the file has not changed."""
+    stat = path.stat()
+    signature = (stat.st_size, stat.st_mtime_ns)
+
+    if cache_dir is not None:
+        cached = _cache_path(path, cache_dir)
+        if cached.exists():
+            with cached.open('rb') as fh:
+                entry = pickle.load(fh)
+            if entry['signature'] == signature:
+                return entry['frame']
+
+    frame = pd.read_csv(path)
+    check_schema(path, frame.columns)
+    for column in CATEGORICAL_COLUMNS:
+        frame[column] = frame[column].astype('category')
+
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with cached.open('wb') as fh:
+            pickle.dump({'signature': signature, 'frame': frame}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    return frame
+
+
+def load_exports(source: str | Path, workers: int | None = None,
+                 cache_dir: Path | None = DEFAULT_CACHE_DIR) -> pd.DataFrame:
+    """Load every export matched by source concurrently and combine them into one table."""
+    files = find_exports(source)
+    if len(files) == 1:
+        return load_export(files[0], cache_dir)
+
+    # pandas' C parser releases the GIL, so threads parse files in parallel
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(lambda f: load_export(f, cache_dir), files))
+
+    # Align categories so the combined columns stay categorical
+    for column in CATEGORICAL_COLUMNS:
+        categories = pd.api.types.union_categoricals([f[column] for f in frames]).categories
+        for frame in frames:
+            frame[column] = frame[column].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Load per-language CSV exports into one table")
+    p.add_argument("source", help="CSV file, directory of CSV files, or glob pattern")
+    p.add_argument("--workers", type=int, help="Parser threads (default: Python's default)")
+    p.add_argument("--no-cache", action="store_true", help="Ignore and do not write cached binaries")
+    args = p.parse_args()
+
+    try:
+        df = load_exports(args.source, args.workers, None if args.no_cache else DEFAULT_CACHE_DIR)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    print(f"{len(df)} rows from {len(find_exports(args.source))} file(s)")
+    print(df.groupby(['language', 'Label'], observed=True).size().to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,296 @@
+"""
+Vectorized feedback vs affirmation statistics for every cell at once.
+
+Computes the same per-cell quantities as the scripts (IQR outlier removal,
+Shapiro-Wilk, Levene, t-test, Welch's t-test, Mann-Whitney U, Cohen's d)
+for all (language, measurement) cells in a few array passes instead of a
+Python loop over cells:
+
+    - the data is sorted once by (cell, group, value); group quantiles for
+      the IQR bounds are read straight from the sorted array
+    - counts, means and variances come from bincount over group codes
+    - t and Welch statistics are computed from those moments
+    - Mann-Whitney U uses tie-averaged ranks within each pooled cell
+    - Levene / Brown-Forsythe uses group centers read from the sorted array
+      and bincount sums of absolute deviations; the variance ratio comes
+      from the same moments
+
+Shapiro-Wilk has no closed form and is still run per group with scipy.
+Mann-Whitney cells small enough for scipy's exact method are also
+delegated to scipy, so results match the scripts.
+"""
+
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+GROUPS = ('feedback', 'affirmation')
+
+RESULT_COLUMNS = ['Language', 'Measurement', 'n_feedback', 'n_affirmation',
+                  'shapiro_p_feedback', 'shapiro_p_affirmation', 'levene_p', 'variance_ratio',
+                  't_stat', 't_pval', 'welch_stat', 'welch_pval', 'mw_stat', 'mw_pval', 'cohens_d']
+
+
+@contextmanager
+def timed(timings: dict | None, stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def _lerp(a, b, t):
+    # Same formula as numpy's linear quantile interpolation, for bit-identical bounds
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+
+def grouped_quantile(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """Linear-interpolation quantile of each group of a group-sorted array."""
+    position = (counts - 1) * q
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, counts - 1)
+    return _lerp(values[starts + below], values[starts + above], position - below)
+
+
+class SortedCells:
+    """Long-format values sorted by (cell, group, value), with group offsets."""
+
+    def __init__(self, df_filtered: pd.DataFrame, measurements: list[str]):
+        rows = df_filtered[df_filtered['Label'].isin(GROUPS)]
+        languages = pd.unique(df_filtered['language'])
+        self.cells = [(language, measurement) for language in languages for measurement in measurements]
+
+        # One (row, measurement) entry per value, without building a long DataFrame
+        language_code = pd.Categorical(rows['language'], categories=languages).codes.astype(np.int64)
+        group_code = (rows['Label'].to_numpy() == 'affirmation').astype(np.int64)
+        cell = language_code[:, None] * len(measurements) + np.arange(len(measurements))
+        group = (cell * 2 + group_code[:, None]).ravel()
+        values = rows[measurements].to_numpy(dtype=float).ravel()
+        present = ~np.isnan(values)
+        values, group = values[present], group[present]
+
+        order = np.lexsort((values, group))
+        self.values = values[order]
+        self.group = group[order]
+        self.n_cells = len(self.cells)
+        self.n_groups = 2 * self.n_cells
+
+    def offsets(self) -> tuple[np.ndarray, np.ndarray]:
+        counts = np.bincount(self.group, minlength=self.n_groups)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        return starts, counts
+
+    def filter(self, keep: np.ndarray) -> None:
+        self.values = self.values[keep]
+        self.group = self.group[keep]
+
+    def slices(self):
+        """(group index, values) for every group, as views into the sorted array."""
+        starts, counts = self.offsets()
+        for g in range(self.n_groups):
+            yield g, self.values[starts[g]:starts[g] + counts[g]]
+
+    def cell_values(self, language: str, measurement: str) -> tuple[np.ndarray, np.ndarray]:
+        """Sorted feedback and affirmation values of one cell, as views into the sorted array."""
+        g = 2 * self.cells.index((language, measurement))
+        starts, counts = self.offsets()
+        return self.values[starts[g]:starts[g] + counts[g]], self.values[starts[g + 1]:starts[g + 1] + counts[g + 1]]
+
+
+def remove_outliers(cells: SortedCells, k: float = 1.5) -> None:
+    """IQR rule per (language, measurement, Label) group, as in the scripts."""
+    starts, counts = cells.offsets()
+    nonempty = counts > 0
+    lower = np.full(cells.n_groups, np.nan)
+    upper = np.full(cells.n_groups, np.nan)
+    q1 = grouped_quantile(cells.values, starts[nonempty], counts[nonempty], 0.25)
+    q3 = grouped_quantile(cells.values, starts[nonempty], counts[nonempty], 0.75)
+    iqr = q3 - q1
+    lower[nonempty] = q1 - k * iqr
+    upper[nonempty] = q3 + k * iqr
+    keep = (cells.values >= lower[cells.group]) & (cells.values <= upper[cells.group])
+    cells.filter(keep)
+
+
+def clean_cells(df_filtered: pd.DataFrame, measurements: list[str]) -> SortedCells:
+    """All cells sorted once, with IQR outliers removed: the input the per-cell scripts share."""
+    cells = SortedCells(df_filtered, measurements)
+    remove_outliers(cells)
+    return cells
+
+
+def moments(cells: SortedCells) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-group count, mean and population variance (ddof=0), two-pass for accuracy."""
+    n = np.bincount(cells.group, minlength=cells.n_groups).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(cells.group, weights=cells.values, minlength=cells.n_groups) / n
+        centered = cells.values - mean[cells.group]
+        var = np.bincount(cells.group, weights=centered * centered, minlength=cells.n_groups) / n
+    return n, mean, var
+
+
+def t_tests(n, mean, var) -> dict[str, np.ndarray]:
+    """Student and Welch t statistics and two-sided p-values for every cell."""
+    n1, n2 = n[0::2], n[1::2]
+    m1, m2 = mean[0::2], mean[1::2]
+    s1, s2 = var[0::2] * n1 / (n1 - 1), var[1::2] * n2 / (n2 - 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        df = n1 + n2 - 2
+        pooled = ((n1 - 1) * s1 + (n2 - 1) * s2) / df
+        t_stat = (m1 - m2) / np.sqrt(pooled * (1 / n1 + 1 / n2))
+        v1, v2 = s1 / n1, s2 / n2
+        welch_df = (v1 + v2)**2 / (v1**2 / (n1 - 1) + v2**2 / (n2 - 1))
+        welch_stat = (m1 - m2) / np.sqrt(v1 + v2)
+    return {
+        't_stat': t_stat,
+        't_pval': 2 * stats.t.sf(np.abs(t_stat), df),
+        'welch_stat': welch_stat,
+        'welch_pval': 2 * stats.t.sf(np.abs(welch_stat), welch_df),
+    }
+
+
+def mann_whitney(cells: SortedCells) -> dict[str, np.ndarray]:
+    """Mann-Whitney U (feedback vs affirmation) for every cell from tie-averaged pooled ranks."""
+    cell = cells.group // 2
+    order = np.lexsort((cells.values, cell))
+    values, cell_sorted = cells.values[order], cell[order]
+    is_feedback = (cells.group[order] % 2) == 0
+
+    # Runs of equal values within a cell are ties; each gets the average rank of its run
+    new_run = np.ones(len(values), dtype=bool)
+    new_run[1:] = (values[1:] != values[:-1]) | (cell_sorted[1:] != cell_sorted[:-1])
+    run_id = np.cumsum(new_run) - 1
+    run_start = np.flatnonzero(new_run)
+    run_length = np.diff(np.append(run_start, len(values)))
+    cell_count = np.bincount(cell_sorted, minlength=cells.n_cells)
+    cell_start = np.concatenate([[0], np.cumsum(cell_count)[:-1]])
+    run_cell = cell_sorted[run_start]
+    run_rank = (run_start - cell_start[run_cell]) + (run_length + 1) / 2
+    ranks = run_rank[run_id]
+
+    n1 = np.bincount(cell_sorted[is_feedback], minlength=cells.n_cells).astype(float)
+    n2 = cell_count - n1
+    r1 = np.bincount(cell_sorted, weights=np.where(is_feedback, ranks, 0.0), minlength=cells.n_cells)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    u2 = n1 * n2 - u1
+
+    # Asymptotic p-value with tie and continuity correction, as scipy computes it
+    tie_term = np.bincount(run_cell, weights=run_length.astype(float)**3 - run_length, minlength=cells.n_cells)
+    total = n1 + n2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sd = np.sqrt(n1 * n2 / 12 * ((total + 1) - tie_term / (total * (total - 1))))
+        z = (np.maximum(u1, u2) - n1 * n2 / 2 - 0.5) / sd
+    p_value = np.clip(2 * stats.norm.sf(z), 0, 1)
+
+    # scipy uses the exact distribution for small cells without ties
+    has_ties = np.bincount(run_cell, weights=(run_length > 1).astype(float), minlength=cells.n_cells) > 0
+    exact = ((n1 <= 8) | (n2 <= 8)) & ~has_ties & (n1 > 0) & (n2 > 0)
+    if exact.any():
+        groups = dict(cells.slices())
+        for c in np.flatnonzero(exact):
+            p_value[c] = stats.mannwhitneyu(groups[2 * c], groups[2 * c + 1], alternative='two-sided').pvalue
+    return {'mw_stat': u1, 'mw_pval': p_value}
+
+
+def shapiro(cells: SortedCells) -> np.ndarray:
+    """Shapiro-Wilk p per group (0 for n <= 3, as in the scripts)."""
+    p_values = np.zeros(cells.n_groups)
+    for g, values in cells.slices():
+        if len(values) > 3:
+            p_values[g] = stats.shapiro(values).pvalue
+    return p_values
+
+
+def group_medians(cells: SortedCells) -> np.ndarray:
+    """Median per group (mean of the two middle values for even n, as np.median)."""
+    starts, counts = cells.offsets()
+    medians = np.full(cells.n_groups, np.nan)
+    nonempty = counts > 0
+    starts, counts = starts[nonempty], counts[nonempty]
+    medians[nonempty] = (cells.values[starts + (counts - 1) // 2] + cells.values[starts + counts // 2]) / 2
+    return medians
+
+
+def levene(cells: SortedCells, n, mean, var, center: str = 'median') -> dict[str, np.ndarray]:
+    """
+    Levene test (center='mean') or Brown-Forsythe (center='median', scipy's
+    default and what the scripts use) for every cell, plus the sample
+    variance ratio feedback / affirmation.
+    """
+    if center not in ('median', 'mean'):
+        raise ValueError(f"center must be 'median' or 'mean', got {center!r}")
+    centers = group_medians(cells) if center == 'median' else mean
+
+    # One-way ANOVA on the absolute deviations from each group's center
+    deviation = np.abs(cells.values - centers[cells.group])
+    cell = np.arange(cells.n_groups) // 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        deviation_mean = np.bincount(cells.group, weights=deviation, minlength=cells.n_groups) / n
+        spread = deviation - deviation_mean[cells.group]
+        within = np.bincount(cells.group // 2, weights=spread * spread, minlength=cells.n_cells)
+        total = n[0::2] + n[1::2]
+        grand_mean = np.bincount(cell, weights=n * deviation_mean, minlength=cells.n_cells) / total
+        between = np.bincount(cell, weights=n * (deviation_mean - grand_mean[cell])**2, minlength=cells.n_cells)
+        statistic = (total - 2) * between / within
+        variance_ratio = (var[0::2] * n[0::2] / (n[0::2] - 1)) / (var[1::2] * n[1::2] / (n[1::2] - 1))
+    return {
+        'levene_stat': statistic,
+        'levene_p': stats.f.sf(statistic, 1, total - 2),
+        'variance_ratio': variance_ratio,
+    }
+
+
+def variance_checks(cells: SortedCells, center: str = 'median') -> pd.DataFrame:
+    """
+    Levene / Brown-Forsythe and variance ratio for every (Language, Measurement)
+    cell of outlier-free cells (see clean_cells), reusing their sorted order.
+    """
+    n, mean, var = moments(cells)
+    return pd.DataFrame({
+        'Language': [language for language, _ in cells.cells],
+        'Measurement': [measurement for _, measurement in cells.cells],
+        **levene(cells, n, mean, var, center),
+    })
+
+
+def compute(df_filtered: pd.DataFrame, measurements: list[str], timings: dict | None = None) -> pd.DataFrame:
+    """All per-cell statistics as one DataFrame (columns RESULT_COLUMNS); stage times go to timings."""
+    with timed(timings, 'load'):
+        cells = SortedCells(df_filtered, measurements)
+    with timed(timings, 'outliers'):
+        remove_outliers(cells)
+    with timed(timings, 'moments'):
+        n, mean, var = moments(cells)
+    with timed(timings, 'shapiro'):
+        shapiro_p = shapiro(cells)
+    with timed(timings, 'levene'):
+        levene_results = levene(cells, n, mean, var)
+    with timed(timings, 't_tests'):
+        t_results = t_tests(n, mean, var)
+    with timed(timings, 'mann_whitney'):
+        mw_results = mann_whitney(cells)
+    with timed(timings, 'cohens_d'):
+        pooled_std = np.sqrt((var[0::2] + var[1::2]) / 2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cohens_d = np.where(pooled_std > 0, (mean[0::2] - mean[1::2]) / pooled_std, 0.0)
+
+    return pd.DataFrame({
+        'Language': [language for language, _ in cells.cells],
+        'Measurement': [measurement for _, measurement in cells.cells],
+        'n_feedback': n[0::2].astype(int),
+        'n_affirmation': n[1::2].astype(int),
+        'shapiro_p_feedback': shapiro_p[0::2],
+        'shapiro_p_affirmation': shapiro_p[1::2],
+        'levene_p': levene_results['levene_p'],
+        'variance_ratio': levene_results['variance_ratio'],
+        **t_results,
+        **mw_results,
+        'cohens_d': cohens_d,
+    }, columns=RESULT_COLUMNS)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Multivariate permutation test of feedback vs affirmation per language.
+
+Instead of testing length, extremes amplitude and velocity one at a time,
+this tests all three together with the energy distance (Székely & Rizzo)
+on measurements standardized within each language. Rows are kept only if
+they pass the scripts' IQR outlier rule on every measurement.
+
+Memory stays linear in the number of rows:
+    - pairwise distances are computed in blocks of rows sized to fit in
+      cache, never as a full n x n matrix
+    - permutations are processed in batches: the label vectors of a batch
+      are shuffled in one vectorized call and all within-group distance
+      sums of the batch come from one blocked sweep (a matrix product per block)
+    - batches are spread across worker processes
+
+For a group indicator x, the pairwise distance matrix D and row sums r:
+    S_11 = x'Dx,  S_12 = x'r - S_11,  S_22 = sum(r) - 2 S_12 - S_11
+    E = 2 S_12 / (n1 n2) - S_11 / n1^2 - S_22 / n2^2,  statistic = n1 n2 / (n1 + n2) E
+
+Usage:
+    python multivariate_test.py [--data PATH] [--permutations 999] [--batch-size 100] [--workers N]
+"""
+
+from __future__ import annotations
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.spatial.distance import cdist
+
+from analyze_feedback_affirmation import data_dir, labels, measurements
+from data_loader import load_exports
+from results_store import ResultsStore
+
+# Target size of one distance block in bytes (roughly an L2 cache)
+BLOCK_BYTES = 1 << 20
+
+
+def default_block_size(n: int) -> int:
+    return max(1, BLOCK_BYTES // (8 * n))
+
+
+def clean_rows(group: pd.DataFrame, k: float = 1.5) -> pd.DataFrame:
+    """Rows within the IQR bounds of the group on every measurement."""
+    group = group.dropna(subset=measurements)
+    keep = np.ones(len(group), dtype=bool)
+    for measurement in measurements:
+        q1, q3 = group[measurement].quantile([0.25, 0.75])
+        iqr = q3 - q1
+        keep &= group[measurement].between(q1 - k * iqr, q3 + k * iqr).to_numpy()
+    return group[keep]
+
+
+def distance_sums(z: np.ndarray, indicators: np.ndarray, block_size: int) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    Blocked sweep over the pairwise Euclidean distances of z.
+
+    Returns x'Dx and x'r for every row x of indicators, and the total sum of D.
+    """
+    n = len(z)
+    within = np.zeros(len(indicators))
+    with_rows = np.zeros(len(indicators))
+    total = 0.0
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = cdist(z[start:stop], z)                 # (b, n)
+        x_block = indicators[:, start:stop]              # (P, b)
+        within += np.einsum('pj,pj->p', x_block @ block, indicators)
+        row_sums = block.sum(axis=1)
+        with_rows += x_block @ row_sums
+        total += row_sums.sum()
+    return within, with_rows, total
+
+
+def energy_statistics(z: np.ndarray, indicators: np.ndarray, block_size: int) -> np.ndarray:
+    """Energy two-sample statistic for every labelling (row of 0/1 indicators) in one sweep."""
+    within, with_rows, total = distance_sums(z, indicators, block_size)
+    n1 = indicators.sum(axis=1)
+    n2 = indicators.shape[1] - n1
+    s11 = within
+    s12 = with_rows - within
+    s22 = total - 2 * s12 - s11
+    energy = 2 * s12 / (n1 * n2) - s11 / n1**2 - s22 / n2**2
+    return n1 * n2 / (n1 + n2) * energy
+
+
+def _permutation_batch(z: np.ndarray, base: np.ndarray, n_permutations: int, block_size: int,
+                       seed: int) -> np.ndarray:
+    # Worker: shuffle all label vectors of the batch at once, then one blocked sweep
+    rng = np.random.default_rng(seed)
+    indicators = rng.permuted(np.tile(base, (n_permutations, 1)), axis=1)
+    return energy_statistics(z, indicators, block_size)
+
+
+def energy_test(feedback: np.ndarray, affirmation: np.ndarray, n_permutations: int = 999,
+                batch_size: int = 100, block_size: int | None = None, pool: ProcessPoolExecutor | None = None,
+                seed: int = 0) -> tuple[float, float]:
+    """Energy distance permutation test; returns (statistic, p-value)."""
+    z = np.vstack([feedback, affirmation])
+    z = (z - z.mean(axis=0)) / z.std(axis=0, ddof=1)
+    base = np.concatenate([np.ones(len(feedback)), np.zeros(len(affirmation))])
+    block_size = block_size or default_block_size(len(z))
+
+    observed = energy_statistics(z, base[None, :], block_size)[0]
+
+    batches = [min(batch_size, n_permutations - start) for start in range(0, n_permutations, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    args = [(z, base, size, block_size, s.generate_state(1)[0]) for size, s in zip(batches, seeds)]
+    if pool is not None:
+        permuted = list(pool.map(_permutation_batch, *zip(*args)))
+    else:
+        permuted = [_permutation_batch(*a) for a in args]
+    permuted = np.concatenate(permuted)
+
+    p_value = (1 + np.sum(permuted >= observed)) / (1 + n_permutations)
+    return float(observed), float(p_value)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Energy-distance permutation test on all three measurements per language")
+    p.add_argument("--data", default=str(data_dir / 'function_wide_all_languages.csv'),
+                   help="Input CSV file, directory of per-language CSV exports, or glob pattern")
+    p.add_argument("--permutations", type=int, default=999, help="Number of permutations (default: 999)")
+    p.add_argument("--batch-size", type=int, default=100, help="Permutations per batch (default: 100)")
+    p.add_argument("--block-size", type=int, help="Rows per distance block (default: sized to ~1 MB)")
+    p.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    p.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = p.parse_args()
+
+    df = load_exports(args.data)
+    df_filtered = df[df['Label'].isin(labels)]
+
+    print("=" * 100)
+    print("MULTIVARIATE TEST: Energy distance on " + ", ".join(measurements))
+    print(f"{args.permutations} permutations per language")
+    print("=" * 100)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for language in df_filtered['language'].unique():
+            lang_data = df_filtered[df_filtered['language'] == language]
+            feedback = clean_rows(lang_data[lang_data['Label'] == 'feedback'])
+            affirmation = clean_rows(lang_data[lang_data['Label'] == 'affirmation'])
+
+            statistic, p_value = energy_test(feedback[measurements].to_numpy(float),
+                                             affirmation[measurements].to_numpy(float),
+                                             n_permutations=args.permutations, batch_size=args.batch_size,
+                                             block_size=args.block_size, pool=pool, seed=args.seed)
+
+            print(f"\n{language}: Feedback n={len(feedback)}, Affirmation n={len(affirmation)}")
+            print(f"  Energy statistic: {statistic:.4f}, permutation p-value: {p_value:.4f} "
+                  f"{'*' if p_value < 0.05 else ''}")
+
+            results.append({
+                'Language': language,
+                'Measurement': ' + '.join(measurements),
+                'n_feedback': len(feedback),
+                'n_affirmation': len(affirmation),
+                'energy_statistic': statistic,
+                'p_value': p_value,
+                'permutations': args.permutations,
+                'Significant': 'YES' if p_value < 0.05 else 'NO'
+            })
+
+    results_df = pd.DataFrame(results)
+    with ResultsStore() as store:
+        run_id = store.record_run('multivariate', results_df, dataset_path=args.data,
+                                  params={'permutations': args.permutations, 'seed': args.seed},
+                                  script=Path(__file__).name)
+        csv_path = store.export_csv('multivariate', run_id=run_id)
+    print(f"\nResults saved to: {csv_path} (run {run_id})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Draft narrative text for each (language, measurement) result with an LLM.
+
+One prompt per result row is sent to an OpenAI-compatible chat completions
+endpoint (SAIA by default, or a local Ollama-style server). Requests run
+concurrently with asyncio over one pooled HTTP client, limited by
+--concurrency and retried with exponential backoff on rate limits, server
+errors and dropped connections. Responses are cached on disk keyed by a
+hash of endpoint, model and prompt, so unchanged cells are not sent again
+on rerun (mock responses are cached under their own 'mock' endpoint).
+
+The API key is read from SAIA_API_KEY (a .env file is loaded if
+python-dotenv is installed). --mock starts a local stand-in server, so the
+whole stage runs offline.
+
+Usage:
+    python narrate.py [--csv results/feedback_affirmation_analysis_results.csv] [--mock]
+                      [--base-url URL] [--model MODEL] [--concurrency N] [--out PATH]
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+import pandas as pd
+
+try:
+    from dotenv import load_dotenv
+except ImportError:  # optional: the key can also come from the shell environment
+    load_dotenv = None
+
+current_dir = Path(__file__).parent
+results_dir = current_dir.parent / 'results'
+DEFAULT_CACHE_DIR = current_dir.parent / 'processed_data' / 'narration_cache'
+
+DEFAULT_BASE_URL = 'https://chat-ai.academiccloud.de/v1'
+DEFAULT_MODEL = 'meta-llama-3.1-8b-instruct'
+
+SYSTEM_PROMPT = ("You are a careful statistician writing short result paragraphs for a report on "
+                 "head nod kinematics. Report the numbers exactly as given and do not speculate "
+                 "beyond them.")
+
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def build_prompt(row: pd.Series) -> str:
+    """Prompt for one result row of feedback_affirmation_analysis_results.csv."""
+    return (
+        f"Write 2-3 sentences for a results section comparing feedback and affirmation head nods.\n"
+        f"Language: {row['Language']}\n"
+        f"Measurement: {row['Measurement']}\n"
+        f"Feedback: n={row['Feedback_N']}, mean={row['Feedback_Mean']:.4f}\n"
+        f"Affirmation: n={row['Affirmation_N']}, mean={row['Affirmation_Mean']:.4f}\n"
+        f"Test: {row['Test']}, p={row['p_value']:.4g} (significant at α=0.05: {row['Significant']})\n"
+        f"Cohen's d: {row['Cohens_d']:.3f} ({row['Effect_Size']})"
+    )
+
+
+def cache_key(endpoint: str, model: str, prompt: str) -> str:
+    payload = json.dumps({'endpoint': endpoint, 'model': model, 'system': SYSTEM_PROMPT, 'prompt': prompt},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """One JSON file per response, named by the cache key."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> str | None:
+        path = self.cache_dir / f"{key}.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))['text']
+
+    def put(self, key: str, model: str, prompt: str, text: str) -> None:
+        path = self.cache_dir / f"{key}.json"
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'model': model, 'prompt': prompt, 'text': text}), encoding='utf-8')
+        tmp.replace(path)
+
+
+async def complete(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, model: str, prompt: str,
+                   max_retries: int = 5, backoff: float = 1.0) -> str:
+    """One chat completion, retried with exponential backoff and jitter."""
+    body = {
+        'model': model,
+        'messages': [{'role': 'system', 'content': SYSTEM_PROMPT},
+                     {'role': 'user', 'content': prompt}],
+        'temperature': 0,
+    }
+    for attempt in range(max_retries + 1):
+        async with semaphore:
+            try:
+                response = await client.post('/chat/completions', json=body)
+            except httpx.TransportError:
+                if attempt == max_retries:
+                    raise
+                response = None
+        if response is not None and response.status_code not in RETRY_STATUS:
+            response.raise_for_status()
+            return response.json()['choices'][0]['message']['content'].strip()
+        if attempt == max_retries:
+            response.raise_for_status()
+
+        delay = backoff * 2**attempt * (1 + random.random())
+        if response is not None and 'retry-after' in response.headers:
+            try:
+                delay = max(delay, float(response.headers['retry-after']))
+            except ValueError:
+                pass
+        await asyncio.sleep(delay)
+    raise RuntimeError("unreachable")
+
+
+async def narrate(rows: pd.DataFrame, base_url: str, model: str, api_key: str | None,
+                  cache: ResponseCache, concurrency: int = 8, max_retries: int = 5,
+                  backoff: float = 1.0, endpoint: str | None = None) -> tuple[list[str], int]:
+    """
+    Narrate every row; returns the texts in row order and the number of cache hits.
+    endpoint names the server in the cache keys (default: base_url).
+    """
+    prompts = [build_prompt(row) for _, row in rows.iterrows()]
+    keys = [cache_key(endpoint or base_url, model, prompt) for prompt in prompts]
+    texts: list[str | None] = [cache.get(key) for key in keys]
+    cache_hits = sum(text is not None for text in texts)
+
+    todo = [i for i, text in enumerate(texts) if text is None]
+    if todo:
+        headers = {'Authorization': f"Bearer {api_key}"} if api_key else {}
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits,
+                                     timeout=httpx.Timeout(60.0)) as client:
+            async def run(i: int) -> None:
+                texts[i] = await complete(client, semaphore, model, prompts[i], max_retries, backoff)
+                cache.put(keys[i], model, prompts[i], texts[i])
+
+            await asyncio.gather(*(run(i) for i in todo))
+
+    return texts, cache_hits
+
+
+def render_markdown(rows: pd.DataFrame, texts: list[str], model: str) -> str:
+    lines = ["# Draft Narration: Feedback vs Affirmation by Language", "",
+             f"*Generated with {model}. Check every number against the result tables before use.*", ""]
+    for language, group in rows.groupby('Language', sort=False):
+        lines += [f"## {language}", ""]
+        for i in group.index:
+            lines += [f"### {rows.at[i, 'Measurement']}", "", texts[rows.index.get_loc(i)], ""]
+    return '\n'.join(lines)
+
+
+class MockCompletionsHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /chat/completions stand-in for offline runs."""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length))
+        prompt = body['messages'][-1]['content']
+        fields = dict(line.split(': ', 1) for line in prompt.splitlines()[1:] if ': ' in line)
+        text = (f"[mock] In {fields.get('Language')}, {fields.get('Measurement')} was compared between "
+                f"feedback ({fields.get('Feedback')}) and affirmation ({fields.get('Affirmation')}); "
+                f"{fields.get('Test')}.")
+        payload = json.dumps({
+            'object': 'chat.completion',
+            'model': body.get('model'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': text}}],
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server() -> tuple[ThreadingHTTPServer, str]:
+    """Serve MockCompletionsHandler on a free local port; returns the server and its base URL."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockCompletionsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Draft result narration per (language, measurement) with an LLM")
+    p.add_argument("--csv", default=str(results_dir / 'feedback_affirmation_analysis_results.csv'),
+                   help="Results CSV to narrate")
+    p.add_argument("--out", default=str(results_dir / 'NARRATION_DRAFT.md'), help="Markdown output path")
+    p.add_argument("--base-url", default=os.getenv('SAIA_BASE_URL', DEFAULT_BASE_URL),
+                   help="OpenAI-compatible API base URL (default: $SAIA_BASE_URL or SAIA)")
+    p.add_argument("--model", default=os.getenv('SAIA_MODEL', DEFAULT_MODEL), help="Model name")
+    p.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent requests (default: 8)")
+    p.add_argument("--max-retries", type=int, default=5, help="Retries per request (default: 5)")
+    p.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Directory of cached responses")
+    p.add_argument("--mock", action="store_true", help="Use a local mock server instead of --base-url")
+    args = p.parse_args()
+
+    csv_path = Path(args.csv)
+    if not csv_path.is_file():
+        print(f"Error: results file not found: {csv_path}", file=sys.stderr)
+        return 2
+
+    if load_dotenv is not None:
+        load_dotenv()
+    api_key = os.getenv('SAIA_API_KEY')
+
+    server = None
+    base_url = args.base_url
+    if args.mock:
+        server, base_url = start_mock_server()
+        api_key = None
+    elif not api_key:
+        print("Warning: SAIA_API_KEY is not set; sending requests without authorization", file=sys.stderr)
+
+    rows = pd.read_csv(csv_path)
+    try:
+        texts, cache_hits = asyncio.run(narrate(rows, base_url, args.model, api_key,
+                                                ResponseCache(Path(args.cache_dir)),
+                                                concurrency=args.concurrency, max_retries=args.max_retries,
+                                                endpoint='mock' if args.mock else None))
+    except httpx.HTTPError as e:
+        print(f"Error: request to {base_url} failed: {e}", file=sys.stderr)
+        return 3
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    Path(args.out).write_text(render_markdown(rows, texts, args.model), encoding='utf-8')
+    print(f"Narrated {len(rows)} cells ({cache_hits} from cache, {len(rows) - cache_hits} requested)")
+    print(f"Draft saved to: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
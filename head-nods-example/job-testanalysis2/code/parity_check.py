@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Numerical parity of the fast engines against the reference scripts.
+
+The reference is the per-cell scipy code path of compare_tests.py,
+check_normality.py and analyze_feedback_affirmation.py (outlier removal,
+Shapiro-Wilk, Levene and variance ratio, t-test, Welch's t-test, Mann-Whitney U, Cohen's d),
+run cell by cell. Each fast engine is run on the same data and every
+output column is compared within the tolerances declared in TOLERANCES.
+Datasets are the bundled CSV plus generated data of varying size, skew and
+tie density. Per-stage timings and speedups are reported next to the checks.
+
+Usage:
+    python parity_check.py [--data PATH] [--no-bundled] [--sizes 50 500 5000] [--seed 0]
+
+Exit codes:
+- 0: all checks pass
+- 1: at least one column is outside its tolerance
+"""
+
+from __future__ import annotations
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import fast_stats
+from analyze_feedback_affirmation import data_dir, labels, measurements, remove_outliers
+from data_loader import load_exports
+from fast_stats import RESULT_COLUMNS, timed
+
+# Column -> (rtol, atol). Counts must match exactly.
+TOLERANCES = {
+    'n_feedback': (0, 0),
+    'n_affirmation': (0, 0),
+    'shapiro_p_feedback': (1e-9, 1e-15),
+    'shapiro_p_affirmation': (1e-9, 1e-15),
+    'levene_p': (1e-7, 1e-12),
+    'variance_ratio': (1e-9, 1e-12),
+    't_stat': (1e-9, 1e-12),
+    't_pval': (1e-7, 1e-12),
+    'welch_stat': (1e-9, 1e-12),
+    'welch_pval': (1e-7, 1e-12),
+    'mw_stat': (0, 1e-9),
+    'mw_pval': (1e-7, 1e-12),
+    'cohens_d': (1e-9, 1e-12),
+}
+
+# Engines checked against the reference: name -> compute(df_filtered, measurements, timings)
+ENGINES = {
+    'fast_stats': fast_stats.compute,
+}
+
+
+def reference(df_filtered: pd.DataFrame, measurements: list[str], timings: dict | None = None) -> pd.DataFrame:
+    """The scripts' per-cell scipy calls, one stage at a time so stages can be timed."""
+    with timed(timings, 'load'):
+        cells = []
+        for language in df_filtered['language'].unique():
+            lang_data = df_filtered[df_filtered['language'] == language]
+            feedback = lang_data[lang_data['Label'] == 'feedback']
+            affirmation = lang_data[lang_data['Label'] == 'affirmation']
+            for measurement in measurements:
+                cells.append({'Language': language, 'Measurement': measurement,
+                              'feedback': feedback, 'affirmation': affirmation})
+
+    with timed(timings, 'outliers'):
+        for cell in cells:
+            measurement = cell['Measurement']
+            cell['x'] = remove_outliers(cell['feedback'], measurement)[measurement].values
+            cell['y'] = remove_outliers(cell['affirmation'], measurement)[measurement].values
+
+    with timed(timings, 'moments'):
+        for cell in cells:
+            cell['n_feedback'], cell['n_affirmation'] = len(cell['x']), len(cell['y'])
+
+    with timed(timings, 'shapiro'):
+        for cell in cells:
+            x, y = cell['x'], cell['y']
+            cell['shapiro_p_feedback'] = stats.shapiro(x)[1] if len(x) > 3 else 0
+            cell['shapiro_p_affirmation'] = stats.shapiro(y)[1] if len(y) > 3 else 0
+
+    with timed(timings, 'levene'):
+        for cell in cells:
+            cell['levene_p'] = stats.levene(cell['x'], cell['y'])[1]
+            cell['variance_ratio'] = np.var(cell['x'], ddof=1) / np.var(cell['y'], ddof=1)
+
+    with timed(timings, 't_tests'):
+        for cell in cells:
+            cell['t_stat'], cell['t_pval'] = stats.ttest_ind(cell['x'], cell['y'])
+            cell['welch_stat'], cell['welch_pval'] = stats.ttest_ind(cell['x'], cell['y'], equal_var=False)
+
+    with timed(timings, 'mann_whitney'):
+        for cell in cells:
+            cell['mw_stat'], cell['mw_pval'] = stats.mannwhitneyu(cell['x'], cell['y'], alternative='two-sided')
+
+    with timed(timings, 'cohens_d'):
+        for cell in cells:
+            x, y = cell['x'], cell['y']
+            pooled_std = np.sqrt((np.std(x)**2 + np.std(y)**2) / 2)
+            cell['cohens_d'] = (np.mean(x) - np.mean(y)) / pooled_std if pooled_std > 0 else 0
+
+    return pd.DataFrame([{column: cell[column] for column in RESULT_COLUMNS} for cell in cells])
+
+
+def generate_dataset(n_feedback: int, skew: float = 0.0, tie_density: float = 0.0, n_languages: int = 4,
+                     affirmation_share: float = 0.1, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic export in the bundled schema. skew is the lognormal sigma
+    (0 = normal); tie_density is the share of values replaced by draws from
+    a small pool of repeated values.
+    """
+    rng = np.random.default_rng(seed)
+    n_affirmation = max(2, int(round(n_feedback * affirmation_share)))
+    frames = []
+    for lang in range(n_languages):
+        for label, n, shift in (('feedback', n_feedback, 0.0), ('affirmation', n_affirmation, 0.3)):
+            frame = {'Label': label, 'ObservationID': np.arange(n), 'language': f"LANG_{lang}", 'tier': 'function'}
+            for measurement in measurements:
+                z = rng.standard_normal(n) + shift
+                values = np.exp(skew * z) if skew > 0 else 1 + 0.2 * z
+                tied = rng.random(n) < tie_density
+                pool = np.round(np.quantile(values, [0.25, 0.5, 0.75]), 3)
+                values[tied] = rng.choice(pool, size=tied.sum())
+                frame[measurement] = values
+            frames.append(pd.DataFrame(frame))
+    return pd.concat(frames, ignore_index=True)
+
+
+def compare(ref: pd.DataFrame, fast: pd.DataFrame) -> pd.DataFrame:
+    rows = []
+    for column in RESULT_COLUMNS[2:]:
+        rtol, atol = TOLERANCES[column]
+        expected = ref[column].to_numpy(dtype=float)
+        actual = fast[column].to_numpy(dtype=float)
+        with np.errstate(invalid='ignore'):
+            abs_diff = np.abs(actual - expected)
+        rows.append({
+            'column': column,
+            'max_abs_diff': np.nanmax(abs_diff) if np.isfinite(abs_diff).any() else 0.0,
+            'rtol': rtol,
+            'atol': atol,
+            'ok': bool(np.allclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True)),
+        })
+    return pd.DataFrame(rows)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Check fast engines against the reference scripts")
+    p.add_argument("--data", default=str(data_dir / 'function_wide_all_languages.csv'),
+                   help="Bundled dataset (file, directory or glob)")
+    p.add_argument("--no-bundled", action="store_true", help="Only check generated datasets")
+    p.add_argument("--sizes", type=int, nargs="+", default=[6, 60, 600, 6000],
+                   help="Feedback rows per language in generated datasets")
+    p.add_argument("--seed", type=int, default=0, help="Seed for generated datasets")
+    args = p.parse_args()
+
+    # Both sides get the same Shapiro-Wilk warning for n > 5000; it says nothing about parity
+    warnings.filterwarnings('ignore', message='scipy.stats.shapiro: For N > 5000')
+
+    datasets = {}
+    if not args.no_bundled:
+        df = load_exports(args.data)
+        datasets['bundled'] = df[df['Label'].isin(labels)]
+    for size in args.sizes:
+        for skew, tie_density in ((0.0, 0.0), (1.0, 0.0), (0.5, 0.3)):
+            name = f"n={size} skew={skew} ties={tie_density}"
+            datasets[name] = generate_dataset(size, skew, tie_density, seed=args.seed)
+
+    all_ok = True
+    for name, df_filtered in datasets.items():
+        ref_timings: dict[str, float] = {}
+        ref = reference(df_filtered, measurements, ref_timings)
+
+        for engine_name, engine in ENGINES.items():
+            fast_timings: dict[str, float] = {}
+            fast = engine(df_filtered, measurements, fast_timings)
+            checks = compare(ref, fast)
+            ok = bool(checks['ok'].all())
+            all_ok &= ok
+
+            print("=" * 100)
+            print(f"DATASET: {name} ({len(df_filtered)} rows) | ENGINE: {engine_name} | {'✅ PARITY' if ok else '❌ MISMATCH'}")
+            print("=" * 100)
+            print(checks.to_string(index=False))
+
+            stages = pd.DataFrame({'reference_s': pd.Series(ref_timings), 'fast_s': pd.Series(fast_timings)})
+            stages.loc['total'] = stages.sum()
+            stages['speedup'] = stages['reference_s'] / stages['fast_s']
+            print(f"\n{stages.to_string(float_format=lambda v: f'{v:.4f}')}\n")
+
+    print("ALL CHECKS PASSED" if all_ok else "SOME CHECKS FAILED")
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+"""
+Vectorized two-sample permutation tests on the mean or median difference.
+
+Instead of looping over permutations in Python, permutations are drawn in
+batches as a (batch, n) matrix of shuffled group labels over the pooled
+values sorted once:
+
+    - group sums (mean difference) are one matrix-vector product per batch
+    - group medians come from the running count of group members along the
+      sorted values (a cumulative sum per row): the k-th smallest member of
+      a group sits where that count first exceeds k
+
+After every batch the Monte-Carlo p-value gets a Clopper-Pearson interval;
+sampling stops as soon as the interval lies entirely above or below alpha.
+The first batch is min_permutations and each later one doubles (up to a
+memory cap), so clear-cut cells need only a few hundred permutations and
+borderline cells run up to max_permutations in a handful of batches.
+
+Usage:
+    python permutation.py [--data PATH] [--statistic mean|median] [--max-permutations 10000]
+"""
+
+from __future__ import annotations
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import stats
+
+STATISTICS = ('mean', 'median')
+
+# Largest number of matrix entries per batch (batch size x pooled n)
+BATCH_ENTRIES = 1 << 19
+
+
+@dataclass
+class PermutationResult:
+    """Observed difference (group 1 - group 2), p-value and how many permutations it took."""
+    statistic: float
+    p_value: float
+    n_permutations: int
+    p_low: float
+    p_high: float
+    stopped_early: bool
+
+
+def clopper_pearson(count, n, confidence: float = 0.99) -> tuple[float, float]:
+    """Exact binomial confidence interval for count successes out of n."""
+    tail = (1 - confidence) / 2
+    low = stats.beta.ppf(tail, count, n - count + 1) if count > 0 else 0.0
+    high = stats.beta.ppf(1 - tail, count + 1, n - count) if count < n else 1.0
+    return float(low), float(high)
+
+
+def _kth_member(values: np.ndarray, running_count: np.ndarray, k) -> np.ndarray:
+    # Value of the (k+1)-th smallest member per row: first position where the running count exceeds k
+    return values[np.argmax(running_count > k, axis=1)]
+
+
+def group_statistics(values: np.ndarray, in_first: np.ndarray, statistic: str) -> np.ndarray:
+    """
+    Difference of the statistic between the two groups for every row of
+    in_first (True = group 1), with values sorted ascending.
+    """
+    n = in_first.shape[1]
+    n1 = int(in_first[0].sum())
+    n2 = n - n1
+    if statistic == 'mean':
+        sum1 = in_first @ values
+        return sum1 / n1 - (values.sum() - sum1) / n2
+
+    count1 = np.cumsum(in_first, axis=1, dtype=np.int32)
+    count2 = np.arange(1, n + 1, dtype=np.int32) - count1
+    median1 = (_kth_member(values, count1, (n1 - 1) // 2) + _kth_member(values, count1, n1 // 2)) / 2
+    median2 = (_kth_member(values, count2, (n2 - 1) // 2) + _kth_member(values, count2, n2 // 2)) / 2
+    return median1 - median2
+
+
+def permutation_test(x, y, statistic: str = 'mean', alpha: float = 0.05, max_permutations: int = 10000,
+                     batch_size: int | None = None, confidence: float = 0.99, min_permutations: int = 200,
+                     seed: int = 0) -> PermutationResult:
+    """
+    Two-sided permutation test of the difference in mean or median between x and y.
+
+    The p-value is (1 + #extreme) / (1 + #permutations). Sampling stops early
+    once the confidence interval of the exceedance rate excludes alpha.
+    batch_size caps the size of a batch (default: BATCH_ENTRIES // n).
+    """
+    if statistic not in STATISTICS:
+        raise ValueError(f"statistic must be one of {STATISTICS}, got {statistic!r}")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) == 0 or len(y) == 0:
+        return PermutationResult(np.nan, np.nan, 0, np.nan, np.nan, False)
+
+    pooled = np.concatenate([x, y])
+    order = np.argsort(pooled, kind='stable')
+    values = pooled[order]
+    labels = order < len(x)
+    n = len(values)
+
+    observed = group_statistics(values, labels[None, :], statistic)[0]
+    # Ties in the permutation distribution must count as extreme despite rounding
+    threshold = abs(observed) - 1e-12 * max(abs(observed), 1.0)
+
+    max_batch = batch_size or max(min_permutations, BATCH_ENTRIES // n)
+    batch = min(min_permutations, max_batch)
+    rng = np.random.default_rng(seed)
+    extreme = 0
+    done = 0
+    p_low, p_high = 0.0, 1.0
+    while done < max_permutations:
+        size = min(batch, max_permutations - done)
+        in_first = rng.permuted(np.tile(labels, (size, 1)), axis=1)
+        extreme += int(np.sum(np.abs(group_statistics(values, in_first, statistic)) >= threshold))
+        done += size
+        p_low, p_high = clopper_pearson(extreme, done, confidence)
+        if done >= min_permutations and (p_high < alpha or p_low > alpha):
+            break
+        batch = min(2 * batch, max_batch)
+
+    return PermutationResult(
+        statistic=float(observed),
+        p_value=(1 + extreme) / (1 + done),
+        n_permutations=done,
+        p_low=p_low,
+        p_high=p_high,
+        stopped_early=done < max_permutations,
+    )
+
+
+def main() -> int:
+    from analyze_feedback_affirmation import data_dir, labels, measurements, remove_outliers
+    from data_loader import load_exports
+
+    p = argparse.ArgumentParser(description="Permutation test of feedback vs affirmation for every cell")
+    p.add_argument("--data", default=str(data_dir / 'function_wide_all_languages.csv'),
+                   help="Input CSV file, directory of per-language CSV exports, or glob pattern")
+    p.add_argument("--statistic", choices=STATISTICS, default='mean', help="Difference to test (default: mean)")
+    p.add_argument("--alpha", type=float, default=0.05, help="Significance level for early stopping (default: 0.05)")
+    p.add_argument("--max-permutations", type=int, default=10000, help="Permutation cap per cell (default: 10000)")
+    p.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = p.parse_args()
+
+    df = load_exports(args.data)
+    df_filtered = df[df['Label'].isin(labels)]
+
+    print(f"{'Language':<15} {'Measurement':<20} {'difference':>12} {'p_value':>9} {'perms':>7}  stopped early")
+    for language in df_filtered['language'].unique():
+        lang_data = df_filtered[df_filtered['language'] == language]
+        feedback = lang_data[lang_data['Label'] == 'feedback']
+        affirmation = lang_data[lang_data['Label'] == 'affirmation']
+        for measurement in measurements:
+            result = permutation_test(remove_outliers(feedback, measurement)[measurement].values,
+                                      remove_outliers(affirmation, measurement)[measurement].values,
+                                      statistic=args.statistic, alpha=args.alpha,
+                                      max_permutations=args.max_permutations, seed=args.seed)
+            print(f"{language:<15} {measurement:<20} {result.statistic:>12.4f} {result.p_value:>9.4f} "
+                  f"{result.n_permutations:>7}  {'yes' if result.stopped_early else 'no'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+"""
+Analytic power for two-sample tests, with a precomputed lookup table.
+
+Power is computed for:
+    - Independent t-test   (exact, noncentral t)
+    - Welch's t-test       (noncentral t with Welch-Satterthwaite df), which
+                             also depends on the ratio of the group variances
+    - Mann-Whitney U test  (asymptotic normal approximation, Noether)
+
+All functions broadcast over arrays of group sizes and effect sizes, so a
+whole (n_small, ratio, d) grid is evaluated in a single call; the Welch
+table has a fourth axis for the variance ratio. The grid is stored as a
+compact .npz table and interpolated at query time.
+
+Usage:
+    python power.py [--out results/power_table.npz] [--n1 627 --n2 91 --d 0.5 --var-ratio 2.3]
+"""
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+import numpy as np
+from scipy import stats
+from scipy.interpolate import RegularGridInterpolator
+
+TESTS = ('t_test', 'welch', 'mann_whitney')
+
+# Default grid: size of the smaller group, allocation ratio (larger/smaller), Cohen's d
+N_SMALL_GRID = np.unique(np.round(np.geomspace(2, 5000, 64)))
+RATIO_GRID = np.geomspace(1, 100, 33)
+D_GRID = np.linspace(0, 2, 81)
+# Welch only: var(larger group) / var(smaller group)
+VAR_RATIO_GRID = np.geomspace(1 / 16, 16, 9)
+
+# Bumped whenever the table layout changes, so stale cached tables are rebuilt
+TABLE_VERSION = 2
+
+
+def ttest_power(n1, n2, d, alpha: float = 0.05):
+    """Exact two-sided power of the independent (pooled variance) t-test."""
+    n1, n2, d = np.broadcast_arrays(np.asarray(n1, float), np.asarray(n2, float), np.asarray(d, float))
+    df = n1 + n2 - 2
+    nc = np.abs(d) * np.sqrt(n1 * n2 / (n1 + n2))
+    return _noncentral_t_power(df, nc, alpha)
+
+
+def welch_power(n1, n2, d, alpha: float = 0.05, var_ratio=1.0):
+    """
+    Two-sided power of Welch's t-test.
+
+    d is standardized by the root mean square of the two SDs (as in the
+    scripts); var_ratio is var(group 1) / var(group 2).
+    """
+    n1, n2, d, var_ratio = np.broadcast_arrays(np.asarray(n1, float), np.asarray(n2, float),
+                                               np.asarray(d, float), np.asarray(var_ratio, float))
+    v1 = 2 * var_ratio / (1 + var_ratio)
+    v2 = 2 / (1 + var_ratio)
+    se2 = v1 / n1 + v2 / n2
+    df = se2**2 / ((v1 / n1)**2 / (n1 - 1) + (v2 / n2)**2 / (n2 - 1))
+    nc = np.abs(d) / np.sqrt(se2)
+    return _noncentral_t_power(df, nc, alpha)
+
+
+def mannwhitney_power(n1, n2, d, alpha: float = 0.05):
+    """
+    Asymptotic two-sided power of the Mann-Whitney U test for a normal shift d.
+
+    Uses P(X > Y) = Phi(d / sqrt(2)) and the null variance of U (Noether, 1987).
+    """
+    n1, n2, d = np.broadcast_arrays(np.asarray(n1, float), np.asarray(n2, float), np.asarray(d, float))
+    p_superiority = stats.norm.cdf(np.abs(d) / np.sqrt(2))
+    sd_u = np.sqrt(n1 * n2 * (n1 + n2 + 1) / 12)
+    shift = n1 * n2 * (p_superiority - 0.5) / sd_u
+    z_crit = stats.norm.ppf(1 - alpha / 2)
+    return stats.norm.cdf(shift - z_crit) + stats.norm.cdf(-shift - z_crit)
+
+
+def _noncentral_t_power(df, nc, alpha):
+    t_crit = stats.t.ppf(1 - alpha / 2, df)
+    power = stats.nct.sf(t_crit, df, nc) + stats.nct.cdf(-t_crit, df, nc)
+    # scipy's noncentral t returns NaN far out in the tails (large nc), where
+    # the normal approximation is accurate and the power is ~1 anyway
+    approx = stats.norm.sf(t_crit - nc) + stats.norm.cdf(-t_crit - nc)
+    return np.where(np.isfinite(power), power, approx)
+
+
+POWER_FUNCTIONS = {
+    't_test': ttest_power,
+    'welch': welch_power,
+    'mann_whitney': mannwhitney_power,
+}
+
+
+class PowerTable:
+    """
+    Power precomputed over an (n_small, ratio, d) grid, interpolated on lookup.
+    The Welch table has a fourth axis, var_ratio = var(larger group) / var(smaller group).
+    """
+
+    def __init__(self, n_small, ratio, d, var_ratio, power: dict[str, np.ndarray], alpha: float = 0.05):
+        self.n_small = np.asarray(n_small, float)
+        self.ratio = np.asarray(ratio, float)
+        self.d = np.asarray(d, float)
+        self.var_ratio = np.asarray(var_ratio, float)
+        self.alpha = alpha
+        self.power = power
+        # Interpolate on log(n), log(ratio) and log(var_ratio): power is much closer to linear there
+        axes = (np.log(self.n_small), np.log(self.ratio), self.d)
+        self._interpolators = {
+            test: RegularGridInterpolator(axes + ((np.log(self.var_ratio),) if test == 'welch' else ()),
+                                          values.astype(float))
+            for test, values in power.items()
+        }
+
+    @classmethod
+    def build(cls, n_small=N_SMALL_GRID, ratio=RATIO_GRID, d=D_GRID, var_ratio=VAR_RATIO_GRID,
+              alpha: float = 0.05) -> 'PowerTable':
+        """Evaluate every test over the full grid in one vectorized pass per test."""
+        n_s, r, dd = np.meshgrid(n_small, ratio, d, indexing='ij')
+        n_l = n_s * r
+        power = {
+            test: POWER_FUNCTIONS[test](n_l, n_s, dd, alpha).astype(np.float32)
+            for test in TESTS if test != 'welch'
+        }
+        power['welch'] = welch_power(n_l[..., None], n_s[..., None], dd[..., None], alpha,
+                                     var_ratio=var_ratio).astype(np.float32)
+        for test, values in power.items():
+            assert np.isfinite(values).all(), f"non-finite power in the {test} table"
+        return cls(n_small, ratio, d, var_ratio, power, alpha)
+
+    @classmethod
+    def load(cls, path: Path) -> 'PowerTable':
+        with np.load(path) as data:
+            version = int(data['version']) if 'version' in data else 1
+            if version != TABLE_VERSION:
+                raise ValueError(f"{path}: power table version differs from {TABLE_VERSION}")
+            power = {test: data[test] for test in TESTS}
+            return cls(data['n_small'], data['ratio'], data['d'], data['var_ratio'], power, float(data['alpha']))
+
+    @classmethod
+    def load_or_build(cls, path: Path, alpha: float = 0.05) -> 'PowerTable':
+        """Load a cached table from path, building and saving it if missing or stale."""
+        path = Path(path)
+        if path.exists():
+            try:
+                table = cls.load(path)
+                if table.alpha == alpha:
+                    return table
+            except ValueError:
+                pass  # older table layout, rebuilt below
+        table = cls.build(alpha=alpha)
+        table.save(path)
+        return table
+
+    def save(self, path: Path) -> None:
+        np.savez_compressed(path, version=TABLE_VERSION, n_small=self.n_small, ratio=self.ratio, d=self.d,
+                            var_ratio=self.var_ratio, alpha=self.alpha, **self.power)
+
+    def lookup(self, test: str, n1, n2, d, var_ratio=1.0):
+        """
+        Interpolated power for groups of size n1 and n2 at effect size d (any order).
+        var_ratio is var(group 1) / var(group 2) and only used for Welch.
+        NaN where a group is empty (n <= 0).
+        """
+        n1, n2, d, var_ratio = np.broadcast_arrays(np.asarray(n1, float), np.asarray(n2, float),
+                                                   np.abs(np.asarray(d, float)), np.asarray(var_ratio, float))
+        empty = np.minimum(n1, n2) <= 0
+        # Empty groups are looked up at the smallest grid size and masked afterwards
+        n1, n2 = np.where(empty, self.n_small[0], n1), np.where(empty, self.n_small[0], n2)
+        n_small = np.clip(np.minimum(n1, n2), self.n_small[0], self.n_small[-1])
+        ratio = np.clip(np.maximum(n1, n2) / np.minimum(n1, n2), self.ratio[0], self.ratio[-1])
+        d = np.clip(d, self.d[0], self.d[-1])
+        columns = [np.log(n_small), np.log(ratio), d]
+        if test == 'welch':
+            # The table is indexed by var(larger group) / var(smaller group)
+            var_ratio = np.where(n1 >= n2, var_ratio, 1 / var_ratio)
+            columns.append(np.log(np.clip(var_ratio, self.var_ratio[0], self.var_ratio[-1])))
+        points = np.stack(columns, axis=-1)
+        power = self._interpolators[test](points.reshape(-1, len(columns))).reshape(d.shape)
+        return np.where(empty, np.nan, power)
+
+    def required_n_small(self, test: str, ratio, d, target: float = 0.8):
+        """
+        Smallest size of the smaller group reaching the target power at the
+        given allocation ratio; NaN where the grid never reaches it.
+
+        The table brackets the answer between two grid values; it is then
+        narrowed to the exact integer by bisection on the analytic power.
+        """
+        ratio, d = np.broadcast_arrays(np.asarray(ratio, float), np.abs(np.asarray(d, float)))
+        shape = ratio.shape
+        ratio, d = ratio.ravel(), d.ravel()
+        n_grid = self.n_small[:, None]
+        power = self.lookup(test, n_grid * ratio, n_grid, d)
+        reached = power >= target
+        first = np.argmax(reached, axis=0)
+        found = reached.any(axis=0)
+
+        low = np.floor(self.n_small[np.maximum(first - 1, 0)])
+        high = np.ceil(self.n_small[first])
+        # Invariant: power(high) >= target > power(low), unless high is already the smallest grid value
+        while True:
+            open_ = found & (high - low > 1)
+            if not open_.any():
+                break
+            mid = np.floor((low + high) / 2)
+            reaches = POWER_FUNCTIONS[test](mid * ratio, mid, d, self.alpha) >= target
+            high = np.where(open_ & reaches, mid, high)
+            low = np.where(open_ & ~reaches, mid, low)
+        return np.where(found, high, np.nan).reshape(shape)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Build the power lookup table and optionally query it")
+    p.add_argument("--out", default=str(Path(__file__).parent.parent / 'results' / 'power_table.npz'),
+                   help="Path of the .npz lookup table (built if missing)")
+    p.add_argument("--alpha", type=float, default=0.05, help="Two-sided significance level (default: 0.05)")
+    p.add_argument("--n1", type=float, help="Size of group 1 for a lookup")
+    p.add_argument("--n2", type=float, help="Size of group 2 for a lookup")
+    p.add_argument("--d", type=float, default=0.5, help="Cohen's d for a lookup (default: 0.5)")
+    p.add_argument("--var-ratio", type=float, default=1.0,
+                   help="var(group 1) / var(group 2) for the Welch lookup (default: 1.0)")
+    args = p.parse_args()
+
+    table = PowerTable.load_or_build(Path(args.out), alpha=args.alpha)
+    print(f"Power table: {args.out} ({len(table.n_small)} x {len(table.ratio)} x {len(table.d)} grid)")
+
+    if args.n1 is not None and args.n2 is not None:
+        for test in TESTS:
+            extra = {'var_ratio': args.var_ratio} if test == 'welch' else {}
+            table_power = float(table.lookup(test, args.n1, args.n2, args.d, **extra))
+            exact_power = float(POWER_FUNCTIONS[test](args.n1, args.n2, args.d, args.alpha, **extra))
+            print(f"  {test:<13} power={table_power:.4f} (exact {exact_power:.4f})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
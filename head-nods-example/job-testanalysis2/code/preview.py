@@ -0,0 +1,175 @@
+"""
+Stratified preview sampling with error bounds.
+
+The CSV export(s) are streamed row by row and a reservoir sample is kept
+per stratum (by default per (language, Label) cell), so no file is ever
+fully loaded.
+The total row budget is shared evenly between the strata seen so far;
+when a new stratum appears, existing reservoirs are randomly thinned, which
+keeps every reservoir a uniform sample of its stratum.
+
+Error bounds for estimates computed on the sample are analytic (normal
+approximation with finite population correction) for means and Cohen's d,
+and Monte-Carlo (bootstrap) for test p-values. When the time budget stops
+the scan early, stratum sizes are unknown and no correction is applied.
+"""
+
+from __future__ import annotations
+import csv
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from data_loader import check_schema, find_exports
+from permutation import permutation_test
+
+Z_95 = stats.norm.ppf(0.975)
+
+
+@dataclass
+class StratifiedSample:
+    """
+    A per-stratum reservoir sample plus the count of rows seen in each stratum
+    (the population count when the scan is complete).
+    """
+    data: pd.DataFrame
+    population: dict[tuple, int]
+    rows_scanned: int
+    complete: bool
+    seconds: float
+    strata: tuple[str, ...] = field(default=('language', 'Label'))
+    unread_files: tuple[Path, ...] = ()
+
+    def population_size(self, *key) -> int:
+        return self.population.get(tuple(key), 0)
+
+    def correction_population(self, *key) -> int | None:
+        """Population size for the finite population correction; None (unknown) if the scan stopped early."""
+        return self.population_size(*key) if self.complete else None
+
+
+def reservoir_sample_csv(source: str | Path, row_budget: int = 2000, strata: tuple[str, ...] = ('language', 'Label'),
+                         labels: list[str] | None = None, numeric_columns: list[str] | None = None,
+                         max_seconds: float | None = None, seed: int = 0) -> StratifiedSample:
+    """
+    Stream the CSV export(s) matched by source (file, directory or glob) and
+    draw a stratified reservoir sample of at most row_budget rows.
+
+    labels restricts sampling to rows whose 'Label' is in the list. If
+    max_seconds is given, scanning stops when the time budget is spent; the
+    sample then only covers the rows read so far (complete=False).
+    """
+    rng = np.random.default_rng(seed)
+    reservoirs: dict[tuple, list[list[str]]] = {}
+    seen: dict[tuple, int] = {}
+    capacity = row_budget
+    rows_scanned = 0
+    complete = True
+    start = time.perf_counter()
+    wanted = set(labels) if labels is not None else None
+    files = find_exports(source)
+
+    for file_number, path in enumerate(files):
+        with path.open(newline='', encoding='utf-8') as fh:
+            reader = csv.reader(fh)
+            header = next(reader)
+            check_schema(path, header)
+            key_idx = [header.index(col) for col in strata]
+            label_idx = header.index('Label')
+
+            for row in reader:
+                rows_scanned += 1
+                # Checking the clock every row is measurable on big files
+                if max_seconds is not None and rows_scanned % 4096 == 0 and time.perf_counter() - start > max_seconds:
+                    complete = False
+                    break
+                if wanted is not None and row[label_idx] not in wanted:
+                    continue
+
+                key = tuple(row[i] for i in key_idx)
+                if key not in reservoirs:
+                    reservoirs[key] = []
+                    seen[key] = 0
+                    # Share the budget between all strata seen so far
+                    capacity = max(1, row_budget // len(reservoirs))
+                    for other_key, reservoir in reservoirs.items():
+                        if len(reservoir) > capacity:
+                            keep = rng.choice(len(reservoir), size=capacity, replace=False)
+                            reservoirs[other_key] = [reservoir[i] for i in sorted(keep)]
+
+                seen[key] += 1
+                reservoir = reservoirs[key]
+                if len(reservoir) < capacity:
+                    reservoir.append(row)
+                else:
+                    # Algorithm R: the t-th item replaces a random slot with probability k/t
+                    j = rng.integers(seen[key])
+                    if j < capacity:
+                        reservoir[j] = row
+        if not complete:
+            break
+
+    rows = [row for reservoir in reservoirs.values() for row in reservoir]
+    data = pd.DataFrame(rows, columns=header)
+    for column in numeric_columns or []:
+        data[column] = pd.to_numeric(data[column], errors='coerce')
+
+    return StratifiedSample(data=data, population=seen, rows_scanned=rows_scanned, complete=complete,
+                            seconds=time.perf_counter() - start, strata=tuple(strata),
+                            unread_files=tuple(files[file_number + 1:]) if not complete else ())
+
+
+def fpc(n: int, population: int | None) -> float:
+    """
+    Finite population correction factor for the variance of a sample mean;
+    1 (no correction) when the population size is unknown (None).
+    """
+    if population is None:
+        return 1.0
+    if population <= 1 or n >= population:
+        return 0.0
+    return (population - n) / (population - 1)
+
+
+def mean_difference_bound(x, y, population_x: int | None, population_y: int | None) -> float:
+    """Half-width of the 95% interval for mean(x) - mean(y)."""
+    var_x = np.var(x, ddof=1) / len(x) * fpc(len(x), population_x) if len(x) > 1 else np.nan
+    var_y = np.var(y, ddof=1) / len(y) * fpc(len(y), population_y) if len(y) > 1 else np.nan
+    return float(Z_95 * np.sqrt(var_x + var_y))
+
+
+def cohens_d_bound(d: float, n_x: int, n_y: int, population_x: int | None, population_y: int | None) -> float:
+    """Half-width of the 95% interval for Cohen's d (Hedges & Olkin large-sample SE)."""
+    if n_x < 2 or n_y < 2:
+        return np.nan
+    se = np.sqrt((n_x + n_y) / (n_x * n_y) + d**2 / (2 * (n_x + n_y)))
+    correction = np.sqrt(max(fpc(n_x, population_x), fpc(n_y, population_y)))
+    return float(Z_95 * se * correction)
+
+
+def bootstrap_pvalue_bounds(x, y, test: str, n_boot: int = 200, seed: int = 0) -> tuple[float, float]:
+    """
+    2.5th and 97.5th percentiles of the test p-value over bootstrap resamples
+    of both groups. All resamples are tested in one vectorized call.
+    """
+    if len(x) < 2 or len(y) < 2:
+        return np.nan, np.nan
+    rng = np.random.default_rng(seed)
+    xb = np.asarray(x)[rng.integers(len(x), size=(n_boot, len(x)))]
+    yb = np.asarray(y)[rng.integers(len(y), size=(n_boot, len(y)))]
+    if test.startswith('Independent t-test'):
+        p_values = stats.ttest_ind(xb, yb, axis=1).pvalue
+    elif test.startswith('Permutation test'):
+        # Each resample is its own (batched, early-stopping) permutation test
+        statistic = 'median' if 'median' in test else 'mean'
+        p_values = np.array([permutation_test(xb[i], yb[i], statistic, max_permutations=999,
+                                              batch_size=200, seed=seed + i).p_value
+                             for i in range(n_boot)])
+    else:
+        p_values = stats.mannwhitneyu(xb, yb, alternative='two-sided', axis=1).pvalue
+    low, high = np.nanpercentile(p_values, [2.5, 97.5])
+    return float(low), float(high)
@@ -0,0 +1,1412 @@
+#!/usr/bin/env python3
+"""
+Typed, columnar analysis results and the reports rendered from them.
+
+Each analysis script (analyze_feedback_affirmation.py, compare_tests.py,
+sample_size_analysis.py, check_normality.py) collects one row per
+(language, measurement) cell into a results table: one numpy array per
+column, with the column types fixed by a schema. Every output is rendered
+from that table in one pass:
+
+    - console: per-cell blocks, summaries and commentary, from string.Template
+      templates with numbers formatted a whole column at a time
+    - CSV: the table itself, recorded in and exported from the results store
+    - Markdown: SUMMARY_REPORT.md and QUICK_REFERENCE.md, from the templates
+      in code/templates/
+
+Text is only generated when an output asks for it, so a quiet run costs
+nothing beyond the statistics. The Markdown reports read stored results
+only and can be regenerated without recomputing anything; they are only
+rendered from full analysis runs, never from preview runs. compare_tests.py
+and sample_size_analysis.py rewrite them after recording their own runs, so
+the reports include their sections whichever script runs last.
+
+Usage:
+    python report.py [--run RUN_ID] [--db PATH] [--out-dir results/] [--console]
+"""
+
+from __future__ import annotations
+import argparse
+import datetime
+import json
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from string import Template
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from power import PowerTable
+from results_store import DEFAULT_DB, ResultsStore, results_dir
+
+templates_dir = Path(__file__).parent / 'templates'
+
+REPORT_FILES = ('SUMMARY_REPORT.md', 'QUICK_REFERENCE.md')
+
+ALPHA = 0.05
+
+# Cohen's d benchmarks; the sample size requirements in the report appendix use all three
+SMALL_EFFECT, MEDIUM_EFFECT, LARGE_EFFECT = 0.2, 0.5, 0.8
+REQUIREMENT_EFFECTS = (('Small', SMALL_EFFECT), ('Medium', MEDIUM_EFFECT), ('Large', LARGE_EFFECT))
+POWER_TARGET = 0.8
+
+
+class ResultTable:
+    """Column-oriented results: one typed numpy array per column, in schema order."""
+
+    # Column -> type (str, int, float or bool); columns in OPTIONAL may be absent as a whole
+    SCHEMA: dict[str, type] = {}
+    OPTIONAL: tuple[str, ...] = ()
+
+    def __init__(self, columns: Mapping[str, Sequence]):
+        missing = [name for name in self.SCHEMA if name not in columns and name not in self.OPTIONAL]
+        if missing:
+            raise ValueError(f"{type(self).__name__}: missing columns {missing}")
+        self.columns = {name: _typed(columns[name], kind) for name, kind in self.SCHEMA.items() if name in columns}
+        if len({len(values) for values in self.columns.values()}) > 1:
+            raise ValueError(f"{type(self).__name__}: columns differ in length")
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]):
+        """Build from per-cell dicts; an optional column is kept if the first row has it."""
+        names = [name for name in cls.SCHEMA
+                 if name not in cls.OPTIONAL or (rows and name in rows[0])]
+        return cls({name: [row[name] for row in rows] for name in names})
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        return cls({name: df[name].to_numpy() for name in cls.SCHEMA if name in df.columns})
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+
+def _typed(values, kind: type) -> np.ndarray:
+    if kind is str:
+        return np.array([str(v) for v in values], dtype=object)
+    return np.asarray(values, dtype={int: np.int64, float: np.float64, bool: np.bool_}[kind])
+
+
+class FeedbackAffirmationResults(ResultTable):
+    """Per-cell results of analyze_feedback_affirmation.py (and batch_runner.py)."""
+
+    SCHEMA = {
+        'Dataset': str,
+        'Tier': str,
+        'Language': str,
+        'Measurement': str,
+        'Feedback_N': int,
+        'Affirmation_N': int,
+        'Feedback_Mean': float,
+        'Affirmation_Mean': float,
+        'Difference': float,
+        'Test': str,
+        'p_value': float,
+        'Significant': str,
+        'Cohens_d': float,
+        'Effect_Size': str,
+        # Descriptives behind the console output
+        'Feedback_Original': int,
+        'Affirmation_Original': int,
+        'Feedback_Median': float,
+        'Affirmation_Median': float,
+        'Feedback_SD': float,
+        'Affirmation_SD': float,
+        'Statistic': float,
+        # Permutation tests only
+        'Permutations': int,
+        # Preview runs only
+        'Feedback_Population': int,
+        'Affirmation_Population': int,
+        'Difference_Bound95': float,
+        'Cohens_d_Bound95': float,
+        'p_value_Low95': float,
+        'p_value_High95': float,
+    }
+    OPTIONAL = ('Dataset', 'Tier', 'Permutations', 'Feedback_Population', 'Affirmation_Population',
+                'Difference_Bound95', 'Cohens_d_Bound95', 'p_value_Low95', 'p_value_High95')
+
+    # Not shown in the console summary table (they are in the per-cell blocks)
+    DESCRIPTIVE = ('Feedback_Original', 'Affirmation_Original', 'Feedback_Median', 'Affirmation_Median',
+                   'Feedback_SD', 'Affirmation_SD', 'Statistic')
+
+    @property
+    def preview(self) -> bool:
+        return 'Difference_Bound95' in self
+
+
+class TestComparisonResults(ResultTable):
+    """Per-cell results of compare_tests.py."""
+
+    SCHEMA = {
+        'Language': str,
+        'Measurement': str,
+        'n_feedback': int,
+        'n_affirmation': int,
+        'shapiro_p_feedback': float,
+        'shapiro_p_affirmation': float,
+        'levene_p': float,
+        'variance_ratio': float,
+        't_test_pval': float,
+        'welch_test_pval': float,
+        'mann_whitney_pval': float,
+        't_test_sig': bool,
+        'welch_test_sig': bool,
+        'mann_whitney_sig': bool,
+        'all_agree': bool,
+        # Test statistics behind the console output
+        't_test_stat': float,
+        'welch_test_stat': float,
+        'mann_whitney_stat': float,
+    }
+    OPTIONAL = ('levene_p', 'variance_ratio', 't_test_stat', 'welch_test_stat', 'mann_whitney_stat')
+
+
+class SampleSizeResults(ResultTable):
+    """Per-cell results of sample_size_analysis.py."""
+
+    SCHEMA = {
+        'Language': str,
+        'Measurement': str,
+        'n_feedback': int,
+        'n_affirmation': int,
+        'percent_affirmation': float,
+        'observed_cohens_d': float,
+        'variance_ratio': float,
+        't_test_power_medium': float,
+        'welch_power_medium': float,
+        'mw_power_medium': float,
+        'mw_power_large': float,
+        'mw_power_observed': float,
+        'affirmation_n_needed_medium': float,
+        't_test_adequate': str,
+        'mw_adequate': str,
+        'power_assessment': str,
+        # Behind the console output
+        'feedback_original': int,
+        'affirmation_original': int,
+        'affirmation_n_needed_observed': float,
+        'affirmation_n_needed_small': float,
+    }
+    OPTIONAL = ('variance_ratio', 't_test_power_medium', 'welch_power_medium', 'mw_power_large',
+                'mw_power_observed', 'affirmation_n_needed_medium', 't_test_adequate', 'power_assessment',
+                'feedback_original', 'affirmation_original', 'affirmation_n_needed_observed',
+                'affirmation_n_needed_small')
+
+    # Not shown in the console summary table (they are in the per-cell blocks)
+    DESCRIPTIVE = ('feedback_original', 'affirmation_original', 'affirmation_n_needed_observed',
+                   'affirmation_n_needed_small')
+
+
+class NormalityResults(ResultTable):
+    """Per-cell results of check_normality.py."""
+
+    SCHEMA = {
+        'Language': str,
+        'Measurement': str,
+        'n_feedback': int,
+        'n_affirmation': int,
+        'shapiro_p_feedback': float,
+        'shapiro_p_affirmation': float,
+        'levene_p': float,
+        'variance_ratio': float,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Console
+# ---------------------------------------------------------------------------
+
+RULE = '=' * 100
+THIN_RULE = '-' * 100
+
+LANGUAGE_BLOCK = Template("""
+$rule
+LANGUAGE: $Language
+$rule
+
+Original counts - Feedback: $Feedback_Original, Affirmation: $Affirmation_Original$population""")
+
+POPULATION_LINE = Template("""
+Population counts - Feedback: $Feedback_Population, Affirmation: $Affirmation_Population""")
+
+CELL_BLOCK = Template("""
+$thin_rule
+MEASUREMENT: $Measurement
+$thin_rule
+After outlier removal:
+  Feedback: $Feedback_N (removed $Feedback_Removed outliers)
+  Affirmation: $Affirmation_N (removed $Affirmation_Removed outliers)
+
+Descriptive Statistics:
+  Feedback    - Mean: $Feedback_Mean, Median: $Feedback_Median, SD: $Feedback_SD
+  Affirmation - Mean: $Affirmation_Mean, Median: $Affirmation_Median, SD: $Affirmation_SD
+  Difference  - Mean: $Difference
+
+Statistical Test: $Test
+  Test statistic: $Statistic
+  p-value: $p_value$permutations
+  Significant difference (α=0.05): $Significant
+  Effect size (Cohen's d): $Cohens_d ($Effect_Size)$preview""")
+
+PERMUTATIONS_LINE = Template("""
+  Permutations: $Permutations""")
+
+PREVIEW_BLOCK = Template("""
+
+Preview error bounds (95%):
+  Difference: ±$Difference_Bound95
+  Cohen's d: ±$Cohens_d_Bound95
+  p-value (bootstrap): [$p_value_Low95, $p_value_High95]""")
+
+SUMMARY_BLOCK = Template("""
+
+$rule
+SUMMARY TABLE$tag
+$rule
+
+$table""")
+
+# Console number formats, applied to whole columns
+CONSOLE_FORMATS = {
+    'Feedback_Mean': '%.4f', 'Affirmation_Mean': '%.4f', 'Difference': '%.4f',
+    'Feedback_Median': '%.4f', 'Affirmation_Median': '%.4f',
+    'Feedback_SD': '%.4f', 'Affirmation_SD': '%.4f',
+    'Statistic': '%.4f', 'p_value': '%.4f', 'Cohens_d': '%.4f',
+    'Difference_Bound95': '%.4f', 'Cohens_d_Bound95': '%.4f', 'p_value_Low95': '%.4f', 'p_value_High95': '%.4f',
+}
+
+
+def _formatted_columns(results: ResultTable, formats: Mapping[str, str]) -> dict[str, np.ndarray]:
+    """Every column as strings, numbers formatted one column at a time."""
+    text = {}
+    for name, values in results.columns.items():
+        if name in formats:
+            text[name] = np.char.mod(formats[name], values)
+        else:
+            text[name] = values.astype(str)
+    return text
+
+
+def render_console(results: FeedbackAffirmationResults) -> str:
+    """Per-language and per-cell blocks followed by the summary table."""
+    text = _formatted_columns(results, CONSOLE_FORMATS)
+    text['Feedback_Removed'] = (results['Feedback_Original'] - results['Feedback_N']).astype(str)
+    text['Affirmation_Removed'] = (results['Affirmation_Original'] - results['Affirmation_N']).astype(str)
+    names = list(text)
+
+    parts = []
+    language = None
+    for values in zip(*text.values()):
+        row = dict(zip(names, values))
+        if row['Language'] != language:
+            language = row['Language']
+            population = POPULATION_LINE.substitute(row) if results.preview else ''
+            parts.append(LANGUAGE_BLOCK.substitute(row, rule=RULE, population=population))
+        parts.append(CELL_BLOCK.substitute(
+            row, thin_rule=THIN_RULE,
+            permutations=PERMUTATIONS_LINE.substitute(row) if 'Permutations' in row else '',
+            preview=PREVIEW_BLOCK.substitute(row) if results.preview else ''))
+
+    summary = results.to_frame().drop(columns=list(FeedbackAffirmationResults.DESCRIPTIVE))
+    parts.append(SUMMARY_BLOCK.substitute(rule=RULE, tag=' (PREVIEW)' if results.preview else '',
+                                          table=summary.to_string(index=False)))
+    return '\n'.join(parts)
+
+
+def _text_rows(text: Mapping[str, np.ndarray]) -> list[dict[str, str]]:
+    names = list(text)
+    return [dict(zip(names, values)) for values in zip(*text.values())]
+
+
+def _share(count: int, total: int) -> str:
+    return f"{count}/{total} ({100 * count / total:.1f}%)" if total else f"{count}/0"
+
+
+def _recommended_test(non_normal_share: float, unequal_variances: int) -> str:
+    """Test to recommend from the share of non-normal groups and the number of unequal-variance cells."""
+    if non_normal_share > 0.5:
+        return "Mann-Whitney U test is the SAFER and MORE APPROPRIATE choice ✅"
+    if unequal_variances:
+        return "t-test assumptions mostly hold; use Welch's t-test where variances are unequal ✅"
+    return "t-test assumptions hold; t-test and Mann-Whitney U are both appropriate ✅"
+
+
+WIDE_RULE = '=' * 120
+
+LANGUAGE_HEADER = Template("""
+$rule
+LANGUAGE: $Language
+$rule""")
+
+COMPARISON_HEADER = Template("""$rule
+COMPARISON: t-test vs Mann-Whitney U test
+$rule""")
+
+COMPARISON_CELL = Template("""
+$Measurement:
+  Sample sizes: Feedback n=$n_feedback, Affirmation n=$n_affirmation
+  Normality (Shapiro-Wilk): Feedback p=$shapiro_p_feedback, Affirmation p=$shapiro_p_affirmation$variances
+
+  TEST RESULTS:
+  ┌─────────────────────────────┬───────────────┬───────────────┐
+  │ Test                        │ Test Stat     │ p-value       │
+  ├─────────────────────────────┼───────────────┼───────────────┤
+  │ Independent t-test          │ $t_test_stat │ $t_test_pval │ $t_test_mark
+  │ Welch's t-test              │ $welch_test_stat │ $welch_test_pval │ $welch_test_mark
+  │ Mann-Whitney U test         │ $mann_whitney_stat │ $mann_whitney_pval │ $mann_whitney_mark
+  └─────────────────────────────┴───────────────┴───────────────┘
+  $agreement""")
+
+VARIANCE_LINE = Template("""
+  Variance ratio (feedback/affirmation): $variance_ratio, Levene p=$levene_p$welch_note""")
+
+DISAGREE_BLOCK = Template("""⚠️  Tests DISAGREE!
+     t-test: $t_test_verdict
+     Welch's t-test: $welch_test_verdict
+     Mann-Whitney U: $mann_whitney_verdict""")
+
+COMPARISON_SUMMARY = Template("""
+
+$rule
+SUMMARY
+$rule
+
+1. How often do all tests agree?
+   $agree of comparisons
+
+2. Cases where t-test and Mann-Whitney U give DIFFERENT conclusions:
+$disagreements
+
+3. Percentage of distributions that are NON-NORMAL (Shapiro-Wilk p < 0.05):
+   Feedback: $non_normal_feedback
+   Affirmation: $non_normal_affirmation$unequal
+
+$rule
+CONCLUSION
+$rule
+
+In this dataset:
+1. $non_normal of the feedback and affirmation distributions fail the Shapiro-Wilk normality test (p < 0.05)
+2. t-test and Mann-Whitney U reach the same conclusion in $same_conclusion comparisons
+3. Mann-Whitney U makes FEWER assumptions and is MORE ROBUST to skewed distributions and outliers,
+   while the t-test relies on the Central Limit Theorem when normality is violated
+
+RECOMMENDATION: $recommendation
+""")
+
+UNEQUAL_BLOCK = Template("""
+
+4. Cells with UNEQUAL variances (Levene p < 0.05), where Welch's t-test is preferred over Student's t:
+   $unequal$cells""")
+
+COMPARISON_FORMATS = {
+    'shapiro_p_feedback': '%.4f', 'shapiro_p_affirmation': '%.4f', 'levene_p': '%.4f', 'variance_ratio': '%.2f',
+    't_test_pval': '%13.4f', 'welch_test_pval': '%13.4f', 'mann_whitney_pval': '%13.4f',
+    't_test_stat': '%13.4f', 'welch_test_stat': '%13.4f', 'mann_whitney_stat': '%13.4f',
+}
+
+COMPARED_TESTS = ('t_test', 'welch_test', 'mann_whitney')
+
+
+def render_comparison_console(results: TestComparisonResults) -> str:
+    """Per-cell test tables of compare_tests.py, the summary and the conclusion."""
+    text = _formatted_columns(results, COMPARISON_FORMATS)
+    for test in COMPARED_TESTS:
+        significant = results[f'{test}_sig']
+        text[f'{test}_mark'] = np.where(significant, '*', ' ')
+        text[f'{test}_verdict'] = np.where(significant, 'Significant', 'Not significant')
+
+    parts = [COMPARISON_HEADER.substitute(rule=WIDE_RULE)]
+    language = None
+    for row in _text_rows(text):
+        if row['Language'] != language:
+            language = row['Language']
+            parts.append(LANGUAGE_HEADER.substitute(row, rule=WIDE_RULE))
+        variances = ''
+        if 'levene_p' in row:
+            unequal = float(row['levene_p']) < ALPHA
+            variances = VARIANCE_LINE.substitute(
+                row, welch_note=' - unequal variances, prefer Welch' if unequal else '')
+        agreement = (f"✅ All tests agree: {row['mann_whitney_verdict']}" if row['all_agree'] == 'True'
+                     else DISAGREE_BLOCK.substitute(row))
+        parts.append(COMPARISON_CELL.substitute(row, variances=variances, agreement=agreement))
+
+    df = results.to_frame()
+    total = len(df)
+    disagree = df[df['t_test_sig'] != df['mann_whitney_sig']]
+    disagreements = '\n'.join(
+        f"   - {r.Language}, {r.Measurement}\n"
+        f"     t-test: p={r.t_test_pval:.4f} ({'sig' if r.t_test_sig else 'ns'}), "
+        f"Mann-Whitney: p={r.mann_whitney_pval:.4f} ({'sig' if r.mann_whitney_sig else 'ns'})"
+        for r in disagree.itertuples()) or "   None! t-test and Mann-Whitney U always agree in this dataset"
+    non_normal_feedback = int((df['shapiro_p_feedback'] < ALPHA).sum())
+    non_normal_affirmation = int((df['shapiro_p_affirmation'] < ALPHA).sum())
+    unequal_cells = df[df['levene_p'] < ALPHA] if 'levene_p' in df else df.iloc[:0]
+    unequal = ''
+    if 'levene_p' in df:
+        unequal = UNEQUAL_BLOCK.substitute(
+            unequal=_share(len(unequal_cells), total),
+            cells=''.join(f"\n   - {r.Language}, {r.Measurement}: variance ratio {r.variance_ratio:.2f}"
+                          for r in unequal_cells.itertuples()))
+    parts.append(COMPARISON_SUMMARY.substitute(
+        rule=WIDE_RULE,
+        agree=_share(int(df['all_agree'].sum()), total),
+        disagreements=disagreements,
+        non_normal_feedback=_share(non_normal_feedback, total),
+        non_normal_affirmation=_share(non_normal_affirmation, total),
+        unequal=unequal,
+        non_normal=_share(non_normal_feedback + non_normal_affirmation, 2 * total),
+        same_conclusion=_share(total - len(disagree), total),
+        recommendation=_recommended_test((non_normal_feedback + non_normal_affirmation) / max(2 * total, 1),
+                                         len(unequal_cells))))
+    return '\n'.join(parts)
+
+
+NORMALITY_HEADER = Template("""$rule
+NORMALITY TESTS: Shapiro-Wilk Test (p > 0.05 indicates normal distribution)
+$rule""")
+
+NORMALITY_CELL = Template("""
+$Measurement:
+  Feedback (n=$n_feedback):    $feedback_normal
+  Affirmation (n=$n_affirmation): $affirmation_normal
+  Equal variances (Levene): p=$levene_p - Equal? $equal_variances (variance ratio $variance_ratio)
+  $recommendation""")
+
+NORMALITY_SUMMARY = Template("""
+
+$rule
+SUMMARY: When to use t-test vs Mann-Whitney U test
+$rule
+
+T-TEST (Parametric) Requirements:
+1. Data is normally distributed (Shapiro-Wilk p > 0.05)
+2. OR sample size is large (n > 30) so Central Limit Theorem applies
+3. Independent samples
+4. (For standard t-test) Equal variances (or use Welch's t-test if unequal)
+
+MANN-WHITNEY U TEST (Non-parametric) Use when:
+1. Data is NOT normally distributed (Shapiro-Wilk p < 0.05)
+2. Sample size is small (n < 30) AND data is non-normal
+3. Data has outliers (even after removal)
+4. Data is ordinal or has ties
+5. You want a more robust test with fewer assumptions
+
+In this dataset:
+- $non_normal distributions are NON-NORMAL (Shapiro-Wilk p < 0.05)
+- Affirmation groups have n=$affirmation_range after outlier removal (smallest: $smallest)
+- $unequal comparisons have UNEQUAL variances (Levene p < 0.05)
+- Therefore: $recommendation
+""")
+
+NORMALITY_FORMATS = {
+    'shapiro_p_feedback': '%.4f', 'shapiro_p_affirmation': '%.4f', 'levene_p': '%.4f', 'variance_ratio': '%.2f',
+}
+
+# Groups up to this size are too small for the Shapiro-Wilk test
+SHAPIRO_MIN_N = 3
+LARGE_SAMPLE = 30
+
+
+def render_normality_console(results: NormalityResults) -> str:
+    """Per-cell normality and equal-variance checks of check_normality.py and the summary."""
+    text = _formatted_columns(results, NORMALITY_FORMATS)
+    testable = {}
+    for group in ('feedback', 'affirmation'):
+        n, p = results[f'n_{group}'], results[f'shapiro_p_{group}']
+        testable[group] = n > SHAPIRO_MIN_N
+        text[f'{group}_normal'] = np.where(
+            testable[group],
+            'p=' + text[f'shapiro_p_{group}'].astype(object) + np.where(p > ALPHA, ' - Normal? YES', ' - Normal? NO'),
+            'N/A (too few samples)')
+    text['equal_variances'] = np.where(results['levene_p'] > ALPHA, 'YES', 'NO')
+    both_normal = (testable['feedback'] & testable['affirmation']
+                   & (results['shapiro_p_feedback'] > ALPHA) & (results['shapiro_p_affirmation'] > ALPHA))
+    large_samples = (results['n_feedback'] > LARGE_SAMPLE) & (results['n_affirmation'] > LARGE_SAMPLE)
+    text['recommendation'] = np.select(
+        [both_normal & large_samples, both_normal, large_samples],
+        ["✅ RECOMMENDATION: t-test is appropriate (both normal, n>30)",
+         "⚠️  RECOMMENDATION: t-test could work (both normal, but small n)",
+         "⚠️  RECOMMENDATION: t-test might work (large n, CLT applies) BUT Mann-Whitney U is safer"],
+        "❌ RECOMMENDATION: Use Mann-Whitney U test (non-normal distribution and/or small n)")
+
+    parts = [NORMALITY_HEADER.substitute(rule=RULE)]
+    language = None
+    for row in _text_rows(text):
+        if row['Language'] != language:
+            language = row['Language']
+            parts.append(LANGUAGE_HEADER.substitute(row, rule=RULE))
+        parts.append(NORMALITY_CELL.substitute(row))
+
+    total = len(results)
+    non_normal = int((results['shapiro_p_feedback'] < ALPHA).sum() + (results['shapiro_p_affirmation'] < ALPHA).sum())
+    unequal = int((results['levene_p'] < ALPHA).sum())
+    smallest = int(np.argmin(results['n_affirmation'])) if total else None
+    parts.append(NORMALITY_SUMMARY.substitute(
+        rule=RULE,
+        non_normal=_share(non_normal, 2 * total),
+        affirmation_range=_range(results['n_affirmation']) if total else 'n/a',
+        smallest=(f"{results['Language'][smallest]}, {results['Measurement'][smallest]}"
+                  if smallest is not None else 'n/a'),
+        unequal=_share(unequal, total),
+        recommendation=_recommended_test(non_normal / max(2 * total, 1), unequal)))
+    return '\n'.join(parts)
+
+
+SAMPLE_SIZE_HEADER = Template("""$rule
+SAMPLE SIZE ANALYSIS: Are Affirmation Groups Large Enough for Statistical Testing?
+$rule""")
+
+SAMPLE_SIZE_CELL = Template("""
+$Measurement:
+  Original: Feedback n=$feedback_original, Affirmation n=$affirmation_original
+  After outlier removal: Feedback n=$n_feedback, Affirmation n=$n_affirmation
+  Affirmation represents $percent_affirmation% of total sample
+
+  Sample Size Adequacy (power at α=$alpha to detect d=$medium_effect):
+    T-test: $t_test_verdict
+    Welch's t-test: power=$welch_power_medium (variance ratio feedback/affirmation = $variance_ratio)
+    Mann-Whitney U: $mw_verdict
+
+  Power Analysis (Mann-Whitney U, $target power at α=$alpha, feedback:affirmation = $ratio:1):
+    Observed effect size (Cohen's d): $observed_cohens_d
+    Power for observed effect: $mw_power_observed
+    Affirmation n needed for observed effect: $affirmation_n_needed_observed
+    Affirmation n needed for medium effect (d=$medium_effect): $affirmation_n_needed_medium
+    Affirmation n needed for small effect (d=$small_effect): $affirmation_n_needed_small
+
+  📊 Overall Assessment: $assessment""")
+
+SAMPLE_SIZE_SUMMARY = Template("""
+
+$rule
+SUMMARY TABLE
+$rule
+
+$table
+
+
+$rule
+OVERALL STATISTICS
+$rule
+
+Affirmation Sample Sizes (after outlier removal):
+$per_language
+
+Overall Statistics:
+  Minimum affirmation n: $min_n
+  Maximum affirmation n: $max_n
+  Mean affirmation n: $mean_n
+  Median affirmation n: $median_n
+
+Adequacy for Mann-Whitney U test (power to detect d=$medium_effect):
+  ✅ Adequate (power≥$target_power): $adequate
+  ⚠️  Acceptable (0.5≤power<$target_power): $acceptable
+  ⚠️  Minimal (0.2≤power<0.5): $minimal
+  ❌ Inadequate (power<0.2): $inadequate
+
+
+$rule
+RECOMMENDATIONS
+$rule
+$warnings
+📋 Recommendations:
+   1. Mann-Whitney U test is still appropriate (works with small samples)
+   2. However, statistical POWER is reduced with small samples
+   3. Non-significant results may be due to lack of power, not lack of effect
+   4. Significant results are more trustworthy (harder to achieve with low power)
+   5. Consider reporting:
+      • Effect sizes (Cohen's d) alongside p-values
+      • Confidence intervals
+      • Power analysis or post-hoc power estimates
+      • Acknowledge sample size limitations in discussion
+   6. Consider collecting more affirmation data if possible
+
+$rule
+KEY STATISTICAL CONCEPTS
+$rule
+
+Sample Size Guidelines:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+1. MINIMUM SAMPLE SIZE (bare minimum to run the test):
+   • Mann-Whitney U: n ≥ 3 per group (technically possible)
+   • t-test: n ≥ 2 per group (technically possible)
+
+2. PRACTICAL MINIMUM (to have any meaningful power):
+   • Mann-Whitney U: n ≥ 10-15 per group
+   • t-test: n ≥ 15-20 per group
+
+3. RECOMMENDED FOR GOOD POWER ($target power at α=$alpha with equal groups, from the power table):
+   • Medium effect (d=$medium_effect): t-test n ≥ $t_medium, Mann-Whitney U n ≥ $mw_medium per group
+   • Small effect (d=$small_effect): t-test n ≥ $t_small, Mann-Whitney U n ≥ $mw_small per group
+
+4. UNEQUAL GROUP SIZES:
+   • Having unequal groups reduces power
+   • The smaller group determines overall power
+   • Rule of thumb: try to keep ratio < 3:1
+
+STATISTICAL POWER:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+• Power = probability of detecting a true effect when it exists
+• $target power is considered acceptable (miss true effect $miss of time)
+• Small samples = low power = high risk of Type II error (false negative)
+• With low power:
+  ✓ Significant results are MORE trustworthy (harder to achieve)
+  ✗ Non-significant results are LESS trustworthy (may be underpowered)
+
+Power depends on:
+  1. Sample size (larger = more power)
+  2. Effect size (larger = more power)
+  3. Significance level (α=0.05 vs 0.01)
+  4. Test type (one-tailed vs two-tailed)
+""")
+
+UNDERPOWERED_BLOCK = Template("""
+⚠️  WARNING: $count comparisons have less than $target Mann-Whitney power to detect a medium effect (d=$medium_effect)
+
+Affirmation samples below the size needed at their allocation ratio:
+$languages
+""")
+
+SEVERELY_UNDERPOWERED_BLOCK = Template("""
+❌ CRITICAL: $count comparisons have less than $target power even for a large effect (d=$large_effect)
+   These are SEVERELY UNDERPOWERED and results should be interpreted with EXTREME CAUTION
+""")
+
+SAMPLE_SIZE_FORMATS = {
+    'percent_affirmation': '%.1f', 'observed_cohens_d': '%.3f', 'variance_ratio': '%.2f',
+    'welch_power_medium': '%.2f', 'mw_power_observed': '%.3f',
+}
+
+# (lowest power, verdict) levels of the per-cell adequacy lines, highest first
+T_TEST_VERDICTS = ((POWER_TARGET, Template("✅ YES (power=$power)")),
+                   (0.5, Template("⚠️  MARGINAL (power=$power, use with caution)")),
+                   (-np.inf, Template("❌ NO (power=$power, too small for t-test)")))
+MW_VERDICTS = ((POWER_TARGET, Template("✅ YES (power=$power, good power)")),
+               (0.5, Template("⚠️  ACCEPTABLE (power=$power, reduced power)")),
+               (0.2, Template("⚠️  MINIMAL (power=$power, very low power)")),
+               (-np.inf, Template("❌ NO (power=$power, insufficient)")))
+
+
+def _verdict(levels, power: float) -> str:
+    template = next((template for threshold, template in levels if power >= threshold), levels[-1][1])
+    return template.substitute(power=f"{power:.2f}")
+
+
+def power_assessment(observed_d: float, power_observed: float, power_medium: float, power_large: float) -> str:
+    """Overall verdict on the power of one sample_size cell."""
+    if observed_d > 0 and power_observed >= POWER_TARGET:
+        return "✅ ADEQUATE for observed effect"
+    if power_medium >= POWER_TARGET:
+        return "✅ ADEQUATE for medium-large effects, may miss small effects"
+    if power_large >= POWER_TARGET:
+        return "⚠️  LOW POWER - can detect only large effects"
+    return "❌ UNDERPOWERED - likely to miss true effects"
+
+
+def render_sample_size_console(results: SampleSizeResults, power: PowerTable) -> str:
+    """Per-cell power blocks of sample_size_analysis.py, the summary, recommendations and concepts."""
+    largest = int(power.n_small[-1])
+
+    def needed(n: float) -> str:
+        return f"~{int(n)}" if np.isfinite(n) else f">{largest}"
+
+    def minimum(n: float) -> str:
+        return f"{n:.0f}" if np.isfinite(n) else f"{largest}+"
+
+    text = _formatted_columns(results, SAMPLE_SIZE_FORMATS)
+    for name in ('affirmation_n_needed_observed', 'affirmation_n_needed_medium', 'affirmation_n_needed_small'):
+        text[name] = np.array([needed(n) for n in results[name]], dtype=object)
+    text['ratio'] = np.char.mod('%.1f', results['n_feedback'] / results['n_affirmation'])
+    text['t_test_verdict'] = np.array([_verdict(T_TEST_VERDICTS, p) for p in results['t_test_power_medium']])
+    text['mw_verdict'] = np.array([_verdict(MW_VERDICTS, p) for p in results['mw_power_medium']])
+    text['assessment'] = np.array([power_assessment(*cell) for cell in zip(
+        results['observed_cohens_d'], results['mw_power_observed'], results['mw_power_medium'],
+        results['mw_power_large'])])
+    settings = {'alpha': f"{power.alpha:g}", 'target': f"{POWER_TARGET:.0%}", 'target_power': f"{POWER_TARGET:g}",
+                'small_effect': SMALL_EFFECT, 'medium_effect': MEDIUM_EFFECT, 'large_effect': LARGE_EFFECT}
+
+    parts = [SAMPLE_SIZE_HEADER.substitute(rule=WIDE_RULE)]
+    language = None
+    for row in _text_rows(text):
+        if row['Language'] != language:
+            language = row['Language']
+            parts.append(LANGUAGE_HEADER.substitute(row, rule=WIDE_RULE))
+        parts.append(SAMPLE_SIZE_CELL.substitute(row, **settings))
+
+    df = results.to_frame()
+    total = len(df)
+    per_language = df.groupby('Language', sort=False)['n_affirmation']
+    adequacy = df['mw_adequate'].value_counts()
+
+    warnings = []
+    underpowered = df[df['mw_power_medium'] < POWER_TARGET]
+    if len(underpowered):
+        languages = '\n'.join(
+            f"  • {language}: n = {cells['n_affirmation'].min()}-{cells['n_affirmation'].max()}, "
+            f"needs {needed(cells['affirmation_n_needed_medium'].max())}"
+            for language, cells in underpowered.groupby('Language', sort=False))
+        warnings.append(UNDERPOWERED_BLOCK.substitute(settings, count=f"{len(underpowered)}/{total}",
+                                                      languages=languages))
+    severely_underpowered = df[df['mw_power_large'] < POWER_TARGET]
+    if len(severely_underpowered):
+        warnings.append(SEVERELY_UNDERPOWERED_BLOCK.substitute(settings,
+                                                               count=f"{len(severely_underpowered)}/{total}"))
+
+    # Group sizes for the target power with equal groups, from the power table
+    balanced_t = power.required_n_small('t_test', 1.0, [MEDIUM_EFFECT, SMALL_EFFECT], target=POWER_TARGET)
+    balanced_mw = power.required_n_small('mann_whitney', 1.0, [MEDIUM_EFFECT, SMALL_EFFECT], target=POWER_TARGET)
+    summary = df.drop(columns=[name for name in SampleSizeResults.DESCRIPTIVE if name in df])
+    parts.append(SAMPLE_SIZE_SUMMARY.substitute(
+        settings,
+        rule=WIDE_RULE,
+        table=summary.to_string(index=False),
+        per_language='\n'.join(f"  {language}: min={n.min()}, max={n.max()}, avg={n.mean():.1f}"
+                               for language, n in per_language),
+        min_n=df['n_affirmation'].min(),
+        max_n=df['n_affirmation'].max(),
+        mean_n=f"{df['n_affirmation'].mean():.1f}",
+        median_n=f"{df['n_affirmation'].median():.1f}",
+        **{level.lower(): _share(int(adequacy.get(label, 0)), total)
+           for level, label in (('Adequate', 'Yes'), ('Acceptable', 'Acceptable'), ('Minimal', 'Minimal'),
+                                ('Inadequate', 'No'))},
+        warnings=''.join(warnings),
+        t_medium=minimum(balanced_t[0]), mw_medium=minimum(balanced_mw[0]),
+        t_small=minimum(balanced_t[1]), mw_small=minimum(balanced_mw[1]),
+        miss=f"{1 - POWER_TARGET:.0%}"))
+    return '\n'.join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Markdown
+# ---------------------------------------------------------------------------
+
+MEASUREMENT_LABELS = {
+    'length (seconds)': 'Length (s)',
+    'extremes amplitude': 'Amplitude',
+    'velocity': 'Velocity',
+}
+
+# Language code -> (full name, language, modality); other codes are reported by code only
+LANGUAGES = {
+    'DGS_2.0_2412': ('German Sign Language', 'German', 'Sign'),
+    'GER_2412': ('German Spoken', 'German', 'Spoken'),
+    'RSL_2507': ('Russian Sign Language', 'Russian', 'Sign'),
+    'RUS_2503': ('Russian Spoken', 'Russian', 'Spoken'),
+}
+FAMILY, MODALITY = 1, 2
+
+
+@dataclass
+class ReportContext:
+    """Run metadata and companion results that the Markdown reports draw on."""
+    run_id: str
+    created_at: str
+    dataset: str
+    params: dict = field(default_factory=dict)
+    comparison: TestComparisonResults | None = None
+    sample_size: SampleSizeResults | None = None
+    power: PowerTable | None = None
+
+
+def _label(measurement: str) -> str:
+    return MEASUREMENT_LABELS.get(measurement, measurement)
+
+
+def _language_name(language: str) -> str:
+    return f"{LANGUAGES[language][0]} ({language})" if language in LANGUAGES else language
+
+
+def _p_text(p: float) -> str:
+    return '<0.001' if p < 0.001 else f"{p:.3f}"
+
+
+def _effect_text(effect: str) -> str:
+    return '**LARGE**' if effect == 'large' else effect.capitalize()
+
+
+def _direction(difference: float) -> str:
+    return 'FB > AF' if difference > 0 else 'AF > FB'
+
+
+def _range(values) -> str:
+    low, high = int(np.min(values)), int(np.max(values))
+    return f"{low:,}" if low == high else f"{low:,}-{high:,}"
+
+
+def _and(items: Sequence[str]) -> str:
+    items = list(items)
+    return ', '.join(items[:-1]) + ' and ' + items[-1] if len(items) > 1 else ''.join(items)
+
+
+def _percent(part, whole) -> str:
+    return f"{100 * part / whole:.1f}%" if whole else 'n/a'
+
+
+def _markdown_rows(header: Sequence[str], rows: list[Sequence]) -> str:
+    lines = ['| ' + ' | '.join(header) + ' |', '|' + '|'.join('-' * (len(h) + 2) for h in header) + '|']
+    lines += ['| ' + ' | '.join(str(v) for v in row) + ' |' for row in rows]
+    return '\n'.join(lines)
+
+
+AUTO_METHOD = """The Mann-Whitney U test (non-parametric) is used unless both groups pass the Shapiro-Wilk normality \
+test and have more than 20 observations, in which case the independent t-test (parametric) is used."""
+
+AUTO_ADVANTAGES = """**Advantages of Mann-Whitney U:**
+- Fewer assumptions (no normality requirement)
+- More robust to skewed data and outliers
+- Appropriate for unequal group sizes"""
+
+AUTO_DETAILS = """### A.1 Mann-Whitney U Test
+
+**Formula:** Ranks all observations together, tests if ranks differ between groups
+
+**Assumptions:**
+- Independent observations
+- Ordinal or continuous data
+- Similar distributions in both groups (for median interpretation)
+
+**Interpretation:**
+- Significant result = distributions differ in location (median/mean)
+- Effect size (Cohen's d) = standardized difference between groups"""
+
+PERMUTATION_METHOD = Template("""Every comparison used a two-sided permutation test of the difference in ${statistic}s \
+(`--test $test`). The group labels are reshuffled over the pooled observations, and the p-value is the share of \
+permutations with a $statistic difference at least as large as the observed one. Sampling stops early once a 99% \
+Clopper-Pearson interval of the p-value lies entirely above or below α=0.05, with at most $max_permutations \
+permutations per comparison (seed $seed); $used permutations were used per comparison.""")
+
+PERMUTATION_ADVANTAGES = Template("""**Advantages of the permutation test:**
+- No normality requirement: the null distribution is built from the data itself
+- Tests the $statistic difference directly, whatever the shape of the distributions
+- Monte-Carlo error is controlled: sampling continues until the p-value is clearly above or below α""")
+
+PERMUTATION_DETAILS = Template("""### A.1 Permutation Test
+
+**Procedure:** Pools both groups, reshuffles the group labels and recomputes the $statistic difference for every \
+permutation
+
+**p-value:** (1 + permutations at least as extreme as observed) / (1 + permutations)
+
+**Assumptions:**
+- Independent observations
+- Exchangeable group labels under the null hypothesis (no difference between the groups)
+
+**Interpretation:**
+- Significant result = the ${statistic}s differ between groups
+- Effect size (Cohen's d) = standardized difference between groups""")
+
+
+def _test_fields(df: pd.DataFrame, params: Mapping, main_test: str) -> dict[str, str]:
+    """Method text of section 2.2 and appendix A.1 for the test the run used (its --test option)."""
+    test = params.get('test', 'auto')
+    if test == 'auto':
+        return {
+            'test_name': main_test,
+            'test_method': AUTO_METHOD,
+            'test_advantages': AUTO_ADVANTAGES,
+            'test_details': AUTO_DETAILS,
+            'test_strength': 'Appropriate non-parametric test (Mann-Whitney U) unless both groups are normal',
+        }
+    statistic = test.split('-', 1)[1]
+    used = _range(df['Permutations']) if 'Permutations' in df and len(df) else 'n/a'
+    return {
+        'test_name': f"permutation test ({statistic} difference)",
+        'test_method': PERMUTATION_METHOD.substitute(
+            statistic=statistic, test=test, used=used, seed=params.get('seed', 0),
+            max_permutations=f"{params.get('max_permutations', 0):,}"),
+        'test_advantages': PERMUTATION_ADVANTAGES.substitute(statistic=statistic),
+        'test_details': PERMUTATION_DETAILS.substitute(statistic=statistic),
+        'test_strength': f"Permutation test of the {statistic} difference (no normality requirement)",
+    }
+
+
+def _group_patterns(df: pd.DataFrame, attribute: int) -> str:
+    """
+    Effect sizes by group of languages sharing a LANGUAGES attribute
+    (FAMILY or MODALITY); unknown language codes form an 'Other' group.
+    """
+    df = df.assign(abs_d=df['Cohens_d'].abs(), significant=df['Significant'] == 'YES')
+    groups: dict[str, list[str]] = {}
+    for language in pd.unique(df['Language']):
+        groups.setdefault(LANGUAGES[language][attribute] if language in LANGUAGES else 'Other', []).append(language)
+    strength = {group: df.loc[df['Language'].isin(languages), 'abs_d'].mean() for group, languages in groups.items()}
+
+    blocks = []
+    for group, languages in groups.items():
+        cells = df[df['Language'].isin(languages)]
+        lines = []
+        if len(groups) > 1 and strength[group] == max(strength.values()):
+            lines.append("Strongest differentiation between feedback and affirmation")
+        elif len(groups) > 1 and strength[group] == min(strength.values()):
+            lines.append("Weakest differentiation between feedback and affirmation")
+        lines.append(f"Mean |d| = {strength[group]:.2f}; significant in {int(cells['significant'].sum())}/"
+                     f"{len(cells)} comparisons")
+        for language in languages:
+            own = cells[cells['Language'] == language]
+            largest = own.loc[own['abs_d'].idxmax()]
+            n_significant = int(own['significant'].sum())
+            detail = (f"{n_significant}/{len(own)} significant" if n_significant else "no significant differences")
+            lines.append(f"{language}: {detail}, largest |d| = {largest['abs_d']:.2f} "
+                         f"({_label(largest['Measurement']).lower()}, {largest['Effect_Size']})")
+        blocks.append(f"**{group} languages ({' & '.join(languages)}):**\n" + '\n'.join(f"- {line}" for line in lines))
+    return '\n\n'.join(blocks)
+
+
+def report_fields(results: FeedbackAffirmationResults, context: ReportContext) -> dict[str, str]:
+    """Every placeholder of the Markdown templates, computed once for both reports."""
+    df = results.to_frame()
+    significant = df['Significant'] == 'YES'
+    languages = list(pd.unique(df['Language']))
+    measurements = list(pd.unique(df['Measurement']))
+    per_language = df.groupby('Language', sort=False)
+    first = per_language.first()
+    n_original = first['Feedback_Original'] + first['Affirmation_Original']
+    removed = np.concatenate([df['Feedback_Original'] - df['Feedback_N'],
+                              df['Affirmation_Original'] - df['Affirmation_N']])
+    kept = (df['Feedback_N'] + df['Affirmation_N']).sum()
+    total = (df['Feedback_Original'] + df['Affirmation_Original']).sum()
+    share = 100 * df['Affirmation_N'] / (df['Feedback_N'] + df['Affirmation_N'])
+    strength = df.assign(abs_d=df['Cohens_d'].abs()).groupby('Language', sort=False)['abs_d'].mean()
+    created = datetime.datetime.fromisoformat(context.created_at)
+
+    tests = df['Test'].value_counts()
+    tests_used = '; '.join(f"{test}: {count}/{len(df)} comparisons" for test, count in tests.items())
+    main_test = tests.index[0] if len(tests) else 'n/a'
+
+    # Direction and significance per measurement across languages
+    patterns = []
+    for measurement in measurements:
+        cells = df[df['Measurement'] == measurement]
+        higher = (cells['Difference'] < 0).sum()
+        higher_sig = ((cells['Difference'] < 0) & (cells['Significant'] == 'YES')).sum()
+        lower_sig = ((cells['Difference'] > 0) & (cells['Significant'] == 'YES')).sum()
+        line = (f"**{_label(measurement)}:** Affirmation > Feedback in {higher}/{len(cells)} languages "
+                f"(significant in {higher_sig}/{len(cells)})")
+        if lower_sig:
+            line += f"; Feedback > Affirmation significant in {lower_sig}/{len(cells)}"
+        patterns.append(line)
+
+    # Per-language result tables with generated interpretation
+    sections = []
+    for number, (language, cells) in enumerate(per_language, start=1):
+        rows = [(_label(c.Measurement), f"{c.Feedback_Mean:.3f}", f"{c.Affirmation_Mean:.3f}",
+                 f"{c.Difference:+.3f}", _p_text(c.p_value),
+                 '✅ YES' if c.Significant == 'YES' else '❌ NO', f"{c.Cohens_d:.3f}", _effect_text(c.Effect_Size))
+                for c in cells.itertuples()]
+        table = _markdown_rows(['Measurement', 'Feedback Mean', 'Affirmation Mean', 'Difference', 'p-value',
+                                'Significant?', "Cohen's d", 'Effect Size'], rows)
+        notes = []
+        for c in cells.itertuples():
+            if c.Significant == 'YES':
+                group = 'Feedback' if c.Difference > 0 else 'Affirmation'
+                notes.append(f"- {group} gestures have significantly HIGHER {c.Measurement} ({c.Effect_Size} effect)")
+            else:
+                notes.append(f"- No significant difference in {c.Measurement}")
+        heading = f"{language} ({LANGUAGES[language][0]})" if language in LANGUAGES else language
+        sections.append(f"#### 3.2.{number} {heading}\n\n{table}\n\n**Interpretation:**\n" + '\n'.join(notes))
+
+    # Significance matrix, with effect sizes for the quick reference
+    matrix_rows, glance_rows = [], []
+    for language, cells in per_language:
+        by_measurement = cells.set_index('Measurement')
+        marks, glance = [], []
+        for measurement in measurements:
+            if measurement not in by_measurement.index:
+                marks.append('')
+                glance.append('')
+                continue
+            c = by_measurement.loc[measurement]
+            if c['Significant'] == 'YES':
+                marks.append(f"✅ {_direction(c['Difference'])}")
+                effect = '**(LARGE)**' if c['Effect_Size'] == 'large' else f"({c['Effect_Size']})"
+                glance.append(f"✅ {_direction(c['Difference'])} {effect}")
+            else:
+                marks.append('❌')
+                glance.append('❌')
+        matrix_rows.append([f"**{language}**"] + marks)
+        glance_rows.append([f"**{language}**"] + glance)
+    matrix_header = ['Language'] + [_label(m) for m in measurements]
+
+    # Sample size adequacy: from sample_size_analysis.py results if stored, else n only
+    adequacy = {}
+    if context.sample_size is not None:
+        power = context.sample_size.to_frame().groupby('Language', sort=False)['mw_power_medium'].min()
+        for language, p in power.items():
+            label = '✅ Good' if p >= 0.8 else '⚠️ Acceptable' if p >= 0.5 else '❌ Underpowered'
+            adequacy[language] = f"{label} (power {p:.2f})"
+    size_rows = [(language, _range(cells['Feedback_N']), _range(cells['Affirmation_N']),
+                  adequacy.get(language, 'n/a')) for language, cells in per_language]
+    size_note = ("Adequacy is the lowest Mann-Whitney power to detect a medium effect (d=0.5) at α=0.05 "
+                 "over the language's measurements (sample_size_analysis.py)."
+                 if adequacy else "Run sample_size_analysis.py to add power-based adequacy ratings.")
+    affirmation_sizes = '\n'.join(f"- {language}: n={_range(cells['Affirmation_N'])}"
+                                  + (f" - {adequacy[language]}" if language in adequacy else '')
+                                  for language, cells in per_language)
+
+    # Test selection evidence: from compare_tests.py results if stored
+    if context.comparison is not None:
+        comparison = context.comparison.to_frame()
+        n = len(comparison)
+        agree = int(comparison['all_agree'].sum())
+        selection_lines = [
+            "1. **Normality (Shapiro-Wilk, p < 0.05 = non-normal):**",
+            f"   - Feedback groups non-normal: {(comparison['shapiro_p_feedback'] < ALPHA).sum()}/{n} "
+            f"({_percent((comparison['shapiro_p_feedback'] < ALPHA).sum(), n)})",
+            f"   - Affirmation groups non-normal: {(comparison['shapiro_p_affirmation'] < ALPHA).sum()}/{n} "
+            f"({_percent((comparison['shapiro_p_affirmation'] < ALPHA).sum(), n)})",
+            "",
+            "2. **Test comparison (t-test, Welch's t-test, Mann-Whitney U):**",
+            f"   - All tests agree in {agree}/{n} comparisons ({_percent(agree, n)})",
+        ]
+        if 'levene_p' in context.comparison:
+            unequal = int((comparison['levene_p'] < ALPHA).sum())
+            selection_lines.append(f"   - Unequal variances (Levene p < 0.05) in {unequal}/{n} comparisons, "
+                                   f"where Welch's t-test is preferred over Student's t")
+        test_selection = '\n'.join(selection_lines)
+    else:
+        test_selection = "Run compare_tests.py to add normality and test-agreement evidence."
+
+    # Key findings
+    findings = []
+    for measurement in measurements:
+        cells = df[df['Measurement'] == measurement]
+        higher_sig = ((cells['Difference'] < 0) & (cells['Significant'] == 'YES')).sum()
+        if higher_sig * 2 > len(cells):
+            findings.append(f"**Affirmations show higher {_label(measurement).lower()}** than feedback "
+                            f"(significant in {higher_sig}/{len(cells)} languages)")
+    if len(strength):
+        findings.append(f"**{strength.idxmax()}** shows the strongest differentiation "
+                        f"(mean |d| = {strength.max():.2f})")
+        findings.append(f"**{strength.idxmin()}** shows the least differentiation "
+                        f"(mean |d| = {strength.min():.2f})")
+    findings.append(f"**{int(significant.sum())}/{len(df)}** comparisons are significant at α={ALPHA}")
+    consistent = [_label(m) for m in measurements
+                  if ((df['Measurement'] == m) & significant).sum() * 2 > (df['Measurement'] == m).sum()]
+    main_finding = (f"Affirmations and feedback differ significantly in {', '.join(consistent).lower()} "
+                    f"in most languages." if consistent else
+                    "No measurement differs significantly in most languages.")
+
+    # Sample size requirements from the power table, for equal groups and at the data's allocation ratio
+    if context.power is not None and len(df):
+        ratio = float(np.median(df['Feedback_N'] / df['Affirmation_N']))
+        d = [effect for _, effect in REQUIREMENT_EFFECTS]
+        required = {
+            't_test': context.power.required_n_small('t_test', 1.0, d, target=POWER_TARGET),
+            'mann_whitney': context.power.required_n_small('mann_whitney', 1.0, d, target=POWER_TARGET),
+            'unbalanced': context.power.required_n_small('mann_whitney', ratio, d, target=POWER_TARGET),
+        }
+        largest = int(context.power.n_small[-1])
+
+        def n_text(n: float) -> str:
+            return f"n ≈ {int(n):,}" if np.isfinite(n) else f"n > {largest:,}"
+
+        requirement_rows = [(f"{name} (d={effect})", n_text(required['t_test'][i]),
+                             n_text(required['mann_whitney'][i]), n_text(required['unbalanced'][i]))
+                            for i, (name, effect) in enumerate(REQUIREMENT_EFFECTS)]
+        sample_size_requirements = (
+            f"**For {POWER_TARGET:.0%} power at α={context.power.alpha} (two-tailed), from the power table "
+            f"(power.py):**\n\n"
+            + _markdown_rows(['Effect', 't-test, per group', 'Mann-Whitney U, per group',
+                              f"Mann-Whitney U, affirmation n at {ratio:.1f}:1"], requirement_rows))
+    else:
+        sample_size_requirements = "Run power.py to add power-based sample size requirements."
+
+    # Direction of the significant differences per measurement, for the overall patterns and the main finding
+    overall = []
+    for measurement in measurements:
+        cells = df[df['Measurement'] == measurement]
+        higher_sig = int(((cells['Difference'] < 0) & (cells['Significant'] == 'YES')).sum())
+        lower_sig = int(((cells['Difference'] > 0) & (cells['Significant'] == 'YES')).sum())
+        label = _label(measurement).lower()
+        if higher_sig * 2 > len(cells):
+            overall.append(f"**Higher {label}** in affirmations (significant in {higher_sig}/{len(cells)} languages)")
+        elif lower_sig * 2 > len(cells):
+            overall.append(f"**Lower {label}** in affirmations (significant in {lower_sig}/{len(cells)} languages)")
+        else:
+            overall.append(f"**No consistent difference in {label}** (affirmations significantly higher in "
+                           f"{higher_sig}/{len(cells)}, lower in {lower_sig}/{len(cells)} languages)")
+
+    # Measurements higher in affirmations in most languages drive the theoretical interpretation
+    emphatic = [_label(m).lower() for m in measurements
+                if (((df['Measurement'] == m) & (df['Difference'] < 0) & significant).sum() * 2
+                    > (df['Measurement'] == m).sum())]
+    if emphatic:
+        higher = _and(emphatic)
+        implications = (f"This pattern suggests that affirmations may be:\n"
+                        f"1. **More emphatic:** Higher {higher} indicate stronger gestures\n"
+                        f"2. **More salient:** Movements with higher {higher} are more visually/physically prominent\n"
+                        f"3. **Functionally distinct:** Different communicative goals require different gesture "
+                        f"properties")
+    else:
+        implications = ("No measurement is consistently higher in affirmations, so the data give no kinematic "
+                        "basis for a functional distinction between affirmation and feedback gestures.")
+
+    # Languages and their affirmation samples, smallest first, for the power caveats
+    smallest_affirmation = per_language['Affirmation_N'].min().sort_values()
+    smallest = smallest_affirmation.index[0] if len(smallest_affirmation) else 'n/a'
+    if context.sample_size is not None:
+        medium_power = context.sample_size.to_frame().groupby('Language', sort=False)['mw_power_medium'].min()
+        cautious = [language for language in languages if medium_power.get(language, 1.0) < POWER_TARGET]
+    else:
+        cautious = [smallest] if len(smallest_affirmation) else []
+
+    if len(strength) > 1:
+        def described(language: str) -> str:
+            name = f"{LANGUAGES[language][0]}, " if language in LANGUAGES else ''
+            return f"{language} ({name}mean |d| = {strength[language]:.2f})"
+
+        variation = (f"The larger effect sizes in {described(strength.idxmax())} versus the smaller effects in "
+                     f"{described(strength.idxmin())} suggest:")
+    else:
+        variation = "With a single language, language variation cannot be assessed; with more languages it may reflect:"
+
+    # Primary conclusions and the confidence in each language's results
+    conclusions = [f"✅ **Affirmations differ kinematically from feedback** in {_and(consistent).lower()}"
+                   if consistent else "⚠️ **No measurement differs consistently** between affirmations and feedback"]
+    if len(strength) > 1:
+        conclusions.append(f"✅ **{strength.idxmax()} shows the strongest differentiation** "
+                           f"(mean |d| = {strength.max():.2f})")
+        conclusions.append(f"✅ **{strength.idxmin()} shows the least differentiation** "
+                           f"(mean |d| = {strength.min():.2f})")
+    test_fields = _test_fields(df, context.params, main_test)
+    if context.params.get('test', 'auto') != 'auto':
+        conclusions.append(f"✅ **The {test_fields['test_name']}** needs no normality assumption")
+    elif context.comparison is not None:
+        comparison = context.comparison.to_frame()
+        non_normal = int((comparison['shapiro_p_feedback'] < ALPHA).sum()
+                         + (comparison['shapiro_p_affirmation'] < ALPHA).sum())
+        conclusions.append(f"✅ **{main_test} is appropriate** for this data "
+                           f"({_percent(non_normal, 2 * len(comparison))} of the groups are non-normal)")
+    if context.sample_size is not None:
+        sizes = context.sample_size.to_frame()
+        adequate = int((sizes['mw_power_medium'] >= POWER_TARGET).sum())
+        conclusions.append(
+            f"✅ **Sample sizes are adequate** for medium effects in all {len(sizes)} comparisons"
+            if adequate == len(sizes) else
+            f"⚠️ **Sample sizes are adequate for medium effects in {adequate}/{len(sizes)} comparisons only** "
+            f"(Mann-Whitney power ≥ {POWER_TARGET:.0%} for d={MEDIUM_EFFECT})")
+
+    confidence_rows = []
+    for language, cells in per_language:
+        sig = cells['Significant'] == 'YES'
+        level = ('HIGH' if (sig & (cells['Cohens_d'].abs() >= MEDIUM_EFFECT)).any() else
+                 'MEDIUM' if sig.any() else 'LOW')
+        rationale = [f"{int(sig.sum())}/{len(cells)} significant"]
+        if sig.any():
+            strongest_cell = cells.loc[cells.loc[sig, 'Cohens_d'].abs().idxmax()]
+            rationale.append(f"largest significant effect d = {strongest_cell['Cohens_d']:.2f} "
+                             f"({strongest_cell['Effect_Size']})")
+        rationale.append(f"affirmation n = {_range(cells['Affirmation_N'])}")
+        if context.sample_size is not None and language in medium_power.index:
+            power_note = f"power for d={MEDIUM_EFFECT}: {medium_power[language]:.2f}"
+            if not sig.any():
+                power_note += (" (underpowered)" if medium_power[language] < POWER_TARGET
+                               else " (a true null is plausible)")
+            rationale.append(power_note)
+        confidence_rows.append((f"{language} effects", f"**{level}**", ', '.join(rationale)))
+
+    evidence = ('strong' if consistent and significant.sum() * 2 > len(df) else
+                'some' if significant.any() else 'no')
+    final_statement = f"This analysis provides **{evidence} evidence** that affirmations are kinematically distinct " \
+                      f"from feedback gestures"
+    final_statement += (f", particularly in their **{_and(consistent).lower()}** properties."
+                        if consistent else ".")
+    if len(strength) > 1:
+        final_statement += (f" The strength of this distinction varies across languages, from mean |d| = "
+                            f"{strength.max():.2f} in {strength.idxmax()} to {strength.min():.2f} in "
+                            f"{strength.idxmin()}.")
+    if cautious:
+        final_statement += (f" Results for {_and(cautious)} should be interpreted cautiously due to power "
+                            f"limitations.")
+
+    retained = (df['Feedback_N'] + df['Affirmation_N']).groupby(df['Measurement']).sum()
+
+    counts_rows = [(language, f"{first.loc[language, 'Feedback_Original']:,}",
+                    f"{first.loc[language, 'Affirmation_Original']:,}",
+                    _percent(first.loc[language, 'Affirmation_Original'], n_original[language]))
+                   for language in languages]
+
+    return {
+        'date': f"{created:%B} {created.day}, {created.year}",
+        'run_id': context.run_id,
+        'dataset': context.dataset,
+        'n_languages': str(len(languages)),
+        'language_list': ', '.join(languages),
+        'n_measurements': str(len(measurements)),
+        'measurement_list': ', '.join(measurements),
+        'language_names': ', '.join(_language_name(language) for language in languages),
+        'n_observations': f"{int(n_original.sum()):,}",
+        'n_retained': _range(retained) if len(retained) else '0',
+        'n_comparisons': str(len(df)),
+        'n_significant': str(int(significant.sum())),
+        'tests_used': tests_used,
+        'main_test': main_test,
+        'key_findings': '\n'.join(f"- {line}" for line in findings),
+        'main_finding': main_finding,
+        'sample_counts_table': _markdown_rows(['Language', 'Feedback', 'Affirmation', 'Affirmation share'],
+                                              counts_rows),
+        'outliers_range': _range(removed) if len(removed) else '0',
+        'retention': _percent(kept, total),
+        'test_selection': test_selection,
+        'sample_size_table': _markdown_rows(['Language', 'Feedback n', 'Affirmation n', 'Adequacy'], size_rows),
+        'sample_size_note': size_note,
+        'affirmation_sizes': affirmation_sizes,
+        'affirmation_share_range': (f"{share.min():.0f}-{share.max():.0f}%" if len(share) else 'n/a'),
+        'effect_range': (f"{df['Cohens_d'].abs().min():.2f} to {df['Cohens_d'].abs().max():.2f}"
+                         if len(df) else 'n/a'),
+        'patterns': '\n'.join(f"{i}. {line}" for i, line in enumerate(patterns, start=1)),
+        'results_by_language': '\n\n---\n\n'.join(sections),
+        'summary_matrix': _markdown_rows(matrix_header, matrix_rows),
+        'glance_matrix': _markdown_rows(matrix_header, glance_rows),
+        'sample_size_requirements': sample_size_requirements,
+        'overall_patterns': '\n'.join(f"{i}. {line}" for i, line in enumerate(overall, start=1)),
+        'language_patterns': _group_patterns(df, FAMILY),
+        'modality_patterns': _group_patterns(df, MODALITY),
+        'implications': implications,
+        'language_variation': variation,
+        'smallest_language': smallest,
+        'smallest_affirmation': _range(per_language.get_group(smallest)['Affirmation_N']) if len(df) else 'n/a',
+        'conclusions': '\n'.join(f"{i}. {line}" for i, line in enumerate(conclusions, start=1)),
+        'confidence_table': _markdown_rows(['Finding', 'Confidence Level', 'Rationale'], confidence_rows),
+        'final_statement': final_statement,
+        **test_fields,
+    }
+
+
+def render_reports(results: FeedbackAffirmationResults, context: ReportContext) -> dict[str, str]:
+    """SUMMARY_REPORT.md and QUICK_REFERENCE.md, keyed by file name."""
+    fields = report_fields(results, context)
+    return {name: Template((templates_dir / name).read_text(encoding='utf-8')).substitute(fields)
+            for name in REPORT_FILES}
+
+
+def write_reports(results: FeedbackAffirmationResults, context: ReportContext,
+                  out_dir: Path = results_dir) -> list[Path]:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, text in render_reports(results, context).items():
+        path = out_dir / name
+        path.write_text(text, encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+def _partial_run(params: str | None, script: str | None) -> str | None:
+    """What kind of partial run a stored feedback_affirmation run is (preview or batch), None for a full run."""
+    params = json.loads(params or '{}')
+    if params.get('preview'):
+        return 'a preview run'
+    if script == 'batch_runner.py' or 'manifest' in params:
+        return 'a batch run'
+    return None
+
+
+def latest_full_run(store: ResultsStore, data_hash: str | None = None) -> str | None:
+    """
+    The most recent feedback_affirmation run that is neither a preview nor a
+    batch, only among runs on the dataset with data_hash if given.
+    """
+    rows = store.conn.execute(
+        "SELECT run_id, params, script FROM runs WHERE kind = 'feedback_affirmation' "
+        "AND (? IS NULL OR dataset_hash IS ?) ORDER BY created_at DESC, run_id DESC", (data_hash, data_hash))
+    return next((run_id for run_id, params, script in rows if _partial_run(params, script) is None), None)
+
+
+def report_context(store: ResultsStore, run_id: str) -> ReportContext:
+    """
+    Metadata of a stored full feedback_affirmation run plus the latest companion
+    runs on the same dataset and the power table.
+    """
+    row = store.conn.execute(
+        "SELECT created_at, dataset_path, dataset_hash, params, script FROM runs "
+        "WHERE run_id = ? AND kind = 'feedback_affirmation'", (run_id,)).fetchone()
+    if row is None:
+        raise KeyError(f"no 'feedback_affirmation' results for run {run_id!r}")
+    created_at, dataset_path, data_hash, params, script = row
+    partial = _partial_run(params, script)
+    if partial is not None:
+        raise ValueError(f"run {run_id!r} is {partial}; reports are only rendered from full analysis runs")
+
+    companions = {}
+    for kind, table in (('test_comparison', TestComparisonResults), ('sample_size', SampleSizeResults)):
+        row = store.conn.execute(
+            "SELECT run_id FROM runs WHERE kind = ? AND dataset_hash IS ? ORDER BY created_at DESC, run_id DESC LIMIT 1",
+            (kind, data_hash)).fetchone()
+        companions[kind] = table.from_frame(store.load(kind, row[0])) if row else None
+
+    return ReportContext(run_id=run_id, created_at=created_at,
+                         dataset=Path(dataset_path).name if dataset_path else 'unknown',
+                         params=json.loads(params or '{}'),
+                         comparison=companions['test_comparison'], sample_size=companions['sample_size'],
+                         power=PowerTable.load_or_build(results_dir / 'power_table.npz', alpha=ALPHA))
+
+
+def load_report(store: ResultsStore, run_id: str | None = None) -> tuple[FeedbackAffirmationResults, ReportContext]:
+    """A stored full feedback_affirmation run (latest by default) and its report context."""
+    run_id = run_id or latest_full_run(store)
+    if run_id is None:
+        raise KeyError("no full 'feedback_affirmation' run in the store")
+    context = report_context(store, run_id)
+    results = FeedbackAffirmationResults.from_frame(store.load('feedback_affirmation', run_id))
+    return results, context
+
+
+def update_reports(store: ResultsStore, run_id: str, out_dir: Path = results_dir) -> list[Path]:
+    """
+    Rewrite the reports of the latest full analysis run on the same dataset as
+    a just recorded companion run (test_comparison or sample_size), so they
+    include it; nothing is written if there is no such analysis run yet.
+    """
+    row = store.conn.execute("SELECT dataset_hash FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    analysis_run = latest_full_run(store, row[0]) if row else None
+    if analysis_run is None:
+        return []
+    return write_reports(*load_report(store, analysis_run), out_dir)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Regenerate the reports from stored results without recomputing")
+    p.add_argument("--run", help="feedback_affirmation run id (default: latest full run)")
+    p.add_argument("--db", default=str(DEFAULT_DB), help="Path to the results database")
+    p.add_argument("--out-dir", default=str(results_dir), help="Directory for the Markdown reports")
+    p.add_argument("--console", action="store_true", help="Also print the console report of the run")
+    args = p.parse_args()
+
+    db = Path(args.db)
+    if not db.exists():
+        print(f"Error: results database not found: {db}", file=sys.stderr)
+        return 2
+
+    with ResultsStore(db) as store:
+        try:
+            results, context = load_report(store, args.run)
+        except (KeyError, ValueError, sqlite3.Error) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 3
+
+    if args.console:
+        print(render_console(results))
+    for path in write_reports(results, context, Path(args.out_dir)):
+        print(f"Report saved to: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
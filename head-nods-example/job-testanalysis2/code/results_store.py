@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed store for analysis results across runs.
+
+One table per result kind, keyed by run id, dataset hash, language,
+measurement and parameters (all indexed). Every run is registered in the
+'runs' table together with its column layout, so the flat CSVs in results/
+are exported from the store exactly as the scripts used to write them.
+
+Usage:
+    python results_store.py runs [--kind KIND]
+    python results_store.py export KIND [--run RUN_ID] [--out PATH]
+    python results_store.py markdown KIND [--run RUN_ID] [--columns COL ...]
+    python results_store.py sql "SELECT ..."
+"""
+
+from __future__ import annotations
+import argparse
+import datetime
+import hashlib
+import json
+import sqlite3
+import sys
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from data_loader import find_exports
+
+results_dir = Path(__file__).parent.parent / 'results'
+DEFAULT_DB = results_dir / 'results.sqlite'
+
+# Result kind -> CSV file the scripts have always written
+KINDS = {
+    'feedback_affirmation': 'feedback_affirmation_analysis_results.csv',
+    'batch_feedback_affirmation': 'batch_feedback_affirmation_results.csv',
+    'test_comparison': 'test_comparison_results.csv',
+    'sample_size': 'sample_size_assessment.csv',
+    'multivariate': 'multivariate_energy_results.csv',
+}
+
+KEY_COLUMNS = ('run_id', 'dataset_hash', 'Language', 'Measurement', 'params')
+
+SQL_TYPES = {'i': 'INTEGER', 'u': 'INTEGER', 'b': 'INTEGER', 'f': 'REAL'}
+
+
+def dataset_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA-256 of the file contents, read in chunks. For a directory or glob
+    of exports, the hash of the sorted per-file hashes.
+    """
+    if not Path(path).is_file():
+        files = find_exports(path)
+        combined = ''.join(f"{f.name}:{dataset_hash(f, chunk_size)}\n" for f in files)
+        return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+    digest = hashlib.sha256()
+    with Path(path).open('rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def new_run_id() -> str:
+    """Sortable run id: UTC timestamp plus a short random suffix."""
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S')
+    return f"{stamp}-{uuid.uuid4().hex[:6]}"
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class ResultsStore:
+    """Thin wrapper around a SQLite database of result tables."""
+
+    def __init__(self, path: Path = DEFAULT_DB):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                script TEXT,
+                dataset_path TEXT,
+                dataset_hash TEXT,
+                params TEXT,
+                columns TEXT NOT NULL,
+                PRIMARY KEY (run_id, kind)
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_kind_created ON runs (kind, created_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_dataset ON runs (dataset_hash)")
+        self.conn.commit()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _table_columns(self, kind: str) -> set[str]:
+        return {row[1] for row in self.conn.execute(f"PRAGMA table_info({_quote(kind)})")}
+
+    def _ensure_table(self, kind: str, df: pd.DataFrame) -> None:
+        """Create the table for kind if needed and add any new result columns."""
+        if kind not in KINDS:
+            raise ValueError(f"unknown result kind: {kind!r} (expected one of {', '.join(KINDS)})")
+        table = _quote(kind)
+        key_definitions = ', '.join(f"{_quote(c)} TEXT" + (' NOT NULL' if c == 'run_id' else '') for c in KEY_COLUMNS)
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({key_definitions})")
+        existing = self._table_columns(kind)
+        for column, dtype in df.dtypes.items():
+            if column not in existing:
+                sql_type = SQL_TYPES.get(dtype.kind, 'TEXT')
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(column)} {sql_type}")
+        # Run lookups use the leading run_id of the key index; cross-run lookups of a cell use the cell index
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote('idx_' + kind + '_key')} "
+                          f"ON {table} ({', '.join(_quote(c) for c in KEY_COLUMNS)})")
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote('idx_' + kind + '_cell')} "
+                          f"ON {table} ({', '.join(_quote(c) for c in KEY_COLUMNS[1:])})")
+        # View of the most recent run of this kind
+        self.conn.execute(f"""
+            CREATE VIEW IF NOT EXISTS {_quote('latest_' + kind)} AS
+            SELECT * FROM {table} WHERE run_id = (
+                SELECT run_id FROM runs WHERE kind = '{kind}' ORDER BY created_at DESC, run_id DESC LIMIT 1
+            )""")
+
+    def record_run(self, kind: str, df: pd.DataFrame, dataset_path: Path | None = None,
+                   params: dict | None = None, script: str | None = None, run_id: str | None = None) -> str:
+        """Store one results DataFrame as a run of the given kind, in a single transaction."""
+        run_id = run_id or new_run_id()
+        data_hash = dataset_hash(dataset_path) if dataset_path is not None else None
+        with self.conn:
+            self.register_run(kind, df, run_id, dataset_path, data_hash, params, script)
+            self.append_rows(kind, df, run_id, data_hash, params)
+        return run_id
+
+    def register_run(self, kind: str, df: pd.DataFrame, run_id: str, dataset_path: Path | None = None,
+                     data_hash: str | None = None, params: dict | None = None, script: str | None = None) -> None:
+        """
+        Register a run and its column layout (taken from df) if not registered yet.
+
+        Does not commit: wrap calls in ``with store.conn:`` to batch them in a transaction.
+        """
+        self._ensure_table(kind, df)
+        columns = [[column, str(dtype)] for column, dtype in df.dtypes.items()]
+        self.conn.execute(
+            "INSERT OR IGNORE INTO runs (run_id, kind, created_at, script, dataset_path, dataset_hash, params, columns) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, kind, datetime.datetime.now(datetime.timezone.utc).isoformat(), script,
+             str(dataset_path) if dataset_path is not None else None, data_hash,
+             json.dumps(params or {}, sort_keys=True), json.dumps(columns)))
+
+    def append_rows(self, kind: str, df: pd.DataFrame, run_id: str, data_hash: str | None = None,
+                    params: dict | None = None) -> None:
+        """
+        Insert the rows of df into the table of kind under run_id.
+
+        Does not commit: wrap calls in ``with store.conn:`` to batch them in a transaction.
+        """
+        self._ensure_table(kind, df)
+        params_json = json.dumps(params or {}, sort_keys=True)
+        insert_columns = ['run_id', 'dataset_hash', 'params'] + list(df.columns)
+        placeholders = ', '.join('?' for _ in insert_columns)
+        sql = (f"INSERT INTO {_quote(kind)} ({', '.join(_quote(c) for c in insert_columns)}) "
+               f"VALUES ({placeholders})")
+        # Plain Python scalars for sqlite3 (numpy types are not adapted)
+        records = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        rows = [(run_id, data_hash, params_json) + tuple(_to_sql(v) for v in record) for record in records]
+        self.conn.executemany(sql, rows)
+
+    def latest_run(self, kind: str) -> str | None:
+        row = self.conn.execute(
+            "SELECT run_id FROM runs WHERE kind = ? ORDER BY created_at DESC, run_id DESC LIMIT 1",
+            (kind,)).fetchone()
+        return row[0] if row else None
+
+    def runs(self, kind: str | None = None) -> pd.DataFrame:
+        sql = "SELECT run_id, kind, created_at, script, dataset_path, dataset_hash, params FROM runs"
+        args: tuple = ()
+        if kind is not None:
+            sql += " WHERE kind = ?"
+            args = (kind,)
+        return pd.read_sql_query(sql + " ORDER BY created_at, run_id", self.conn, params=args)
+
+    def load(self, kind: str, run_id: str | None = None) -> pd.DataFrame:
+        """Results of one run (latest by default) with the columns and dtypes it was written with."""
+        run_id = run_id or self.latest_run(kind)
+        row = self.conn.execute("SELECT columns FROM runs WHERE run_id = ? AND kind = ?", (run_id, kind)).fetchone()
+        if row is None:
+            raise KeyError(f"no {kind!r} results for run {run_id!r}")
+        columns = json.loads(row[0])
+        select = ', '.join(_quote(name) for name, _ in columns)
+        df = pd.read_sql_query(f"SELECT {select} FROM {_quote(kind)} WHERE run_id = ? ORDER BY rowid",
+                               self.conn, params=(run_id,))
+        for name, dtype in columns:
+            if dtype == 'bool':
+                df[name] = df[name].astype(bool)
+        return df
+
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def export_csv(self, kind: str, path: Path | None = None, run_id: str | None = None) -> Path:
+        """Write the results of a run to CSV (by default the kind's usual file in results/)."""
+        path = Path(path) if path is not None else results_dir / KINDS[kind]
+        self.load(kind, run_id).to_csv(path, index=False)
+        return path
+
+    def to_markdown(self, kind: str, columns: list[str] | None = None, run_id: str | None = None,
+                    float_format: str = '{:.4f}') -> str:
+        """Render the results of a run as a Markdown table, like those in SUMMARY_REPORT.md."""
+        df = self.load(kind, run_id)
+        if columns:
+            df = df[columns]
+        return markdown_table(df, float_format)
+
+
+def _to_sql(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def markdown_table(df: pd.DataFrame, float_format: str = '{:.4f}') -> str:
+    """Plain Markdown table without extra dependencies."""
+    def cell(value) -> str:
+        if isinstance(value, float):
+            return float_format.format(value)
+        return str(value)
+
+    lines = ['| ' + ' | '.join(str(c) for c in df.columns) + ' |',
+             '|' + '|'.join('---' for _ in df.columns) + '|']
+    for record in df.itertuples(index=False, name=None):
+        lines.append('| ' + ' | '.join(cell(v) for v in record) + ' |')
+    return '\n'.join(lines)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Query and export the SQLite results store")
+    p.add_argument("--db", default=str(DEFAULT_DB), help="Path to the results database")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    p_runs = sub.add_parser("runs", help="List stored runs")
+    p_runs.add_argument("--kind", choices=sorted(KINDS))
+
+    p_export = sub.add_parser("export", help="Export a run to CSV")
+    p_export.add_argument("kind", choices=sorted(KINDS))
+    p_export.add_argument("--run", help="Run id (default: latest)")
+    p_export.add_argument("--out", help="Output CSV path (default: the kind's file in results/)")
+
+    p_md = sub.add_parser("markdown", help="Print a run as a Markdown table")
+    p_md.add_argument("kind", choices=sorted(KINDS))
+    p_md.add_argument("--run", help="Run id (default: latest)")
+    p_md.add_argument("--columns", nargs="+", help="Columns to include")
+
+    p_sql = sub.add_parser("sql", help="Run an SQL query and print the result")
+    p_sql.add_argument("query")
+
+    args = p.parse_args()
+
+    db = Path(args.db)
+    if not db.exists():
+        print(f"Error: results database not found: {db}", file=sys.stderr)
+        return 2
+
+    with ResultsStore(db) as store:
+        try:
+            if args.command == "runs":
+                print(store.runs(args.kind).to_string(index=False))
+            elif args.command == "export":
+                print(store.export_csv(args.kind, args.out, args.run))
+            elif args.command == "markdown":
+                print(store.to_markdown(args.kind, args.columns, args.run))
+            elif args.command == "sql":
+                print(store.query(args.query).to_string(index=False))
+        except (KeyError, sqlite3.Error) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 3
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())